@@ -0,0 +1,386 @@
+import argparse
+import itertools
+import json
+import random
+import time
+import tracemalloc
+
+from models.HyperEdge import HyperEdge
+from models.HyperGraph import HyperGraph
+from models.PlanCache import PlanCache
+from models.Relation import MultisetRelation, RelationalCatalog, RelTuple
+
+
+def chain(length: int):
+    """
+    Function to generate the chain query R0(X0, X1), R1(X1, X2), ...
+
+    :param length: (int) number of atoms.
+    :return: (HyperGraph) of the query.
+    """
+    edges = [HyperEdge("R{}".format(i), {"X{}".format(i), "X{}".format(i + 1)}) for i in range(length)]
+    return _hypergraph(edges)
+
+
+def star(arms: int):
+    """
+    Function to generate the star query R1(X0, X1), R2(X0, X2), ... around the centre X0.
+
+    :param arms: (int) number of atoms.
+    :return: (HyperGraph) of the query.
+    """
+    edges = [HyperEdge("R{}".format(i), {"X0", "X{}".format(i)}) for i in range(1, arms + 1)]
+    return _hypergraph(edges)
+
+
+def snowflake(arms: int, depth: int):
+    """
+    Function to generate a snowflake query: a fact atom F(K1, ..., Kn) whose
+    every key starts a chain of dimension atoms D1_1(K1, A1_1), D1_2(A1_1, A1_2), ...
+
+    :param arms: (int) number of keys of the fact atom.
+    :param depth: (int) number of dimension atoms per key.
+    :return: (HyperGraph) of the query.
+    """
+    edges = [HyperEdge("F", {"K{}".format(i) for i in range(1, arms + 1)})]
+    for i in range(1, arms + 1):
+        previous = "K{}".format(i)
+        for j in range(1, depth + 1):
+            current = "A{}_{}".format(i, j)
+            edges.append(HyperEdge("D{}_{}".format(i, j), {previous, current}))
+            previous = current
+
+    return _hypergraph(edges)
+
+
+def cycle(length: int):
+    """
+    Function to generate the cyclic query R0(X0, X1), ..., Rn-1(Xn-1, X0).
+
+    :param length: (int) number of atoms, at least three.
+    :return: (HyperGraph) of the query.
+    """
+    edges = [HyperEdge("R{}".format(i), {"X{}".format(i), "X{}".format((i + 1) % length)}) for i in range(length)]
+    return _hypergraph(edges)
+
+
+def random_acyclic(atoms: int, max_arity=3, seed=0):
+    """
+    Function to generate a random acyclic query. Every atom shares some
+    variables of one earlier atom and introduces fresh ones, such that the
+    atoms form a join tree in the order of their generation.
+
+    :param atoms: (int) number of atoms.
+    :param max_arity: (int) maximal number of variables per atom.
+    :param seed: (int) seed of the generator.
+    :return: (HyperGraph) of the query.
+    """
+    rng = random.Random(seed)
+    fresh = itertools.count()
+    edges = [HyperEdge("R0", {"X{}".format(next(fresh)) for _ in range(rng.randint(1, max_arity))})]
+    for i in range(1, atoms):
+        parent = sorted(rng.choice(edges).get_variables())
+        shared = set(rng.sample(parent, rng.randint(1, len(parent))))
+        arity = rng.randint(len(shared), max(len(shared), max_arity))
+        shared.update("X{}".format(next(fresh)) for _ in range(arity - len(shared) or 1))
+        edges.append(HyperEdge("R{}".format(i), shared))
+
+    return _hypergraph(edges)
+
+
+def random_cyclic(atoms: int, variables: int, arity=2, seed=0, attempts=1000):
+    """
+    Function to generate a random query over few variables, which is cyclic
+    unless the draw happens to be acyclic, in which case it is redrawn. A
+    cyclic query needs at least three atoms, each over at least two but not
+    all of the variables.
+
+    :param atoms: (int) number of atoms.
+    :param variables: (int) number of variables.
+    :param arity: (int) number of variables per atom.
+    :param seed: (int) seed of the generator.
+    :param attempts: (int) maximal number of draws.
+    :return: (HyperGraph) of the query.
+    """
+    if atoms < 3 or not 2 <= arity < variables:
+        raise ValueError("No cyclic query has {} atoms of arity {} over {} variables".format(atoms, arity, variables))
+
+    rng = random.Random(seed)
+    names = ["X{}".format(i) for i in range(variables)]
+    for _ in range(attempts):
+        edges = [HyperEdge("R{}".format(i), set(rng.sample(names, arity))) for i in range(atoms)]
+        hypergraph = _hypergraph(edges)
+        if not hypergraph.is_acyclic():
+            return hypergraph
+
+    raise ValueError("No cyclic query was drawn in {} attempts".format(attempts))
+
+
+def _hypergraph(edges: list):
+    return HyperGraph(set().union(*[edge.get_variables() for edge in edges]), set(edges))
+
+
+def renamed(hypergraph: HyperGraph, seed=0):
+    """
+    Function to generate a query of the same shape, i.e., with the variables
+    and the relations of the query renamed at random.
+
+    :param hypergraph: (HyperGraph) query to rename.
+    :param seed: (int) seed of the generator.
+    :return: (HyperGraph) of the renamed query.
+    """
+    rng = random.Random(seed)
+    variables = sorted(hypergraph.get_vertices())
+    names = ["V{}_{}".format(seed, i) for i in range(len(variables))]
+    rng.shuffle(names)
+    mapping = dict(zip(variables, names))
+    edges = sorted(hypergraph.get_edges(), key=lambda edge: edge.get_label())
+    rng.shuffle(edges)
+    return _hypergraph([HyperEdge("Q{}_{}".format(seed, i), {mapping[var] for var in edge.get_variables()})
+                        for i, edge in enumerate(edges)])
+
+
+def relations(hypergraph: HyperGraph, size: int, domain: int, skew=0.0, seed=0):
+    """
+    Function to generate a relation for every atom of a query. Values are
+    drawn from a Zipf distribution over the domain: the smaller the domain,
+    the more selective the joins, the larger the skew, the more frequent
+    the few most popular values.
+
+    :param hypergraph: (HyperGraph) query to generate relations for.
+    :param size: (int) number of tuples drawn per relation, duplicates add up.
+    :param domain: (int) number of values per variable.
+    :param skew: (float) exponent of the Zipf distribution, uniform for zero.
+    :param seed: (int) seed of the generator.
+    :return: (RelationalCatalog) wherein the relations are stored.
+    """
+    rng = random.Random(seed)
+    weights = list(itertools.accumulate(1.0 / (rank ** skew) for rank in range(1, domain + 1)))
+    catalog = RelationalCatalog()
+    for edge in sorted(hypergraph.get_edges(), key=lambda edge: edge.get_label()):
+        variables = sorted(edge.get_variables())
+        counts = {}
+        for _ in range(size):
+            values = rng.choices(range(domain), cum_weights=weights, k=len(variables))
+            tup = RelTuple(dict(zip(variables, values)))
+            counts[tup] = counts.get(tup, 0) + 1
+
+        relation = MultisetRelation(edge.get_label(), set(variables))
+        relation.add(counts)
+        catalog.add(relation)
+
+    return catalog
+
+
+def naive_join(relations: list):
+    """
+    Baseline that joins the relations one after the other by enumerating
+    the cartesian product of the intermediate result with the next relation
+    and keeping the pairs of tuples that agree on the shared variables.
+
+    :param relations: (list) MultisetRelations to join.
+    :return: (MultisetRelation) result of the join.
+    """
+    result = relations[0]
+    for right in relations[1:]:
+        shared = frozenset(result.get_variables().intersection(right.get_variables()))
+        counts = {}
+        for l_tup, l_mult in result.generator():
+            for r_tup, r_mult in right.generator():
+                if l_tup.project(shared) == r_tup.project(shared):
+                    tup = l_tup.join(r_tup)
+                    counts[tup] = counts.get(tup, 0) + l_mult * r_mult
+
+        result = MultisetRelation("", set(result.get_variables()).union(right.get_variables()))
+        result.add(counts)
+
+    return result
+
+
+class Phases:
+    """
+    Class that measures consecutive phases of a run, i.e., their duration
+    and, optionally, the peak of the memory allocated during each of them.
+    """
+    def __init__(self, memory=True):
+        self._memory = memory
+        self._phases = {}
+
+    def run(self, name: str, phase):
+        """
+        Function to run and measure a phase.
+
+        :param name: (String) name of the phase.
+        :param phase: (Function) without arguments.
+        :return: (object) outcome of the phase.
+        """
+        if self._memory:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        outcome = phase()
+        seconds = time.perf_counter() - start
+
+        peak = None
+        if self._memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        self._phases[name] = {"seconds": seconds, "peak_bytes": peak}
+        return outcome
+
+    def get_phases(self):
+        return self._phases
+
+
+def run(name: str, hypergraph: HyperGraph, catalog: RelationalCatalog, max_width=2, baseline_limit=10 ** 8,
+        memory=True):
+    """
+    Function to evaluate a query phase by phase and, if the cartesian
+    products it requires are small enough, by the naive baseline.
+
+    :param name: (String) name of the workload.
+    :param hypergraph: (HyperGraph) query to evaluate.
+    :param catalog: (RelationalCatalog) wherein the relations are stored.
+    :param max_width: (int) maximal width of the decomposition of cyclic queries.
+    :param baseline_limit: (int) maximal size of the cartesian product of all relations for the baseline to run.
+    :param memory: (bool) whether to measure the memory allocated.
+    :return: (dict) report of the run.
+    """
+    phases = Phases(memory)
+    join_tree = phases.run("join_tree", lambda: hypergraph.join_tree(max_width))
+    if not join_tree.get_root():
+        return {"workload": name, "error": "no decomposition of width {}".format(max_width)}
+
+    if not hypergraph.is_acyclic():
+        phases.run("materialize", lambda: join_tree.materialize(catalog))
+
+    gjt = phases.run("generalize", join_tree.generalize)
+    phases.run("initialize", lambda: gjt.initialize(catalog))
+    phases.run("semi_join_reduction", gjt.semi_join_reduction)
+    result = phases.run("enumerate", gjt.enumerate)
+    count = sum(mult for _, mult in result.generator())
+
+    report = {"workload": name, "atoms": len(hypergraph.get_edges()), "results": result.size(), "count": count,
+              "phases": phases.get_phases()}
+
+    names = sorted(edge.get_label() for edge in hypergraph.get_edges())
+    product = 1
+    for relation in names:
+        product *= catalog.get(relation).size()
+
+    if product <= baseline_limit:
+        baseline = Phases(memory)
+        expected = baseline.run("naive_join", lambda: naive_join([catalog.get(relation) for relation in names]))
+        report["baseline"] = baseline.get_phases()["naive_join"]
+        report["baseline_agrees"] = sum(mult for _, mult in expected.generator()) == count
+
+    return report
+
+
+def plan_cache(name: str, hypergraph: HyperGraph, max_width=2, repetitions=10):
+    """
+    Function to compare planning a query directly with obtaining its plan
+    from a PlanCache, both for the first query of its shape, which misses,
+    and for renamed queries of the same shape, which hit. Acyclic queries
+    are planned directly by the PlanCache, hence only cyclic ones hit.
+
+    :param name: (String) name of the workload.
+    :param hypergraph: (HyperGraph) query to plan.
+    :param max_width: (int) maximal width of the decomposition of cyclic queries.
+    :param repetitions: (int) number of renamed queries planned, the average time being reported.
+    :return: (dict) report of the run.
+    """
+    queries = [renamed(hypergraph, seed) for seed in range(repetitions)]
+
+    def direct():
+        for query in queries:
+            join_tree = query.join_tree(max_width)
+            if join_tree.get_root():
+                join_tree.generalize()
+
+    cache = PlanCache()
+    start = time.perf_counter()
+    cache.plan(hypergraph, max_width)
+    miss = time.perf_counter() - start
+
+    phases = Phases(memory=False)
+    phases.run("direct", direct)
+    phases.run("hit", lambda: [cache.plan(query, max_width) for query in queries])
+    seconds = {phase: measure["seconds"] / repetitions for phase, measure in phases.get_phases().items()}
+
+    return {"workload": name, "atoms": len(hypergraph.get_edges()), "direct": seconds["direct"], "miss": miss,
+            "hit": seconds["hit"], "hits": cache.get_hits()}
+
+
+def workloads(size: int, domain: int, skew: float, seed: int):
+    """
+    Generator to list the default suite of workloads.
+
+    :return: (Generator) iterating (name, HyperGraph, RelationalCatalog) triples.
+    """
+    queries = [("chain-4", chain(4)), ("star-4", star(4)), ("snowflake-3x2", snowflake(3, 2)),
+               ("acyclic-6", random_acyclic(6, seed=seed)), ("cycle-4", cycle(4)),
+               ("cyclic-5", random_cyclic(5, 5, seed=seed))]
+    for name, hypergraph in queries:
+        yield name, hypergraph, relations(hypergraph, size, domain, skew, seed)
+
+
+def shapes(seed: int):
+    """
+    Function to list the queries of which the planning is benchmarked.
+
+    :return: (list) (name, HyperGraph) pairs.
+    """
+    return [("chain-20", chain(20)), ("chain-100", chain(100)), ("star-20", star(20)), ("star-100", star(100)),
+            ("snowflake-5x4", snowflake(5, 4)), ("acyclic-30", random_acyclic(30, seed=seed)),
+            ("cycle-12", cycle(12)), ("cyclic-8", random_cyclic(8, 7, seed=seed)),
+            ("cyclic-16x3", random_cyclic(16, 10, arity=3, seed=seed))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the decomposition and evaluation of join queries.")
+    parser.add_argument("--size", type=int, default=50, help="tuples drawn per relation")
+    parser.add_argument("--domain", type=int, default=20, help="values per variable")
+    parser.add_argument("--skew", type=float, default=0.0, help="exponent of the Zipf distribution of values")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-width", type=int, default=2, help="maximal width for cyclic queries")
+    parser.add_argument("--baseline-limit", type=int, default=10 ** 8,
+                        help="maximal size of the cartesian product for the naive baseline")
+    parser.add_argument("--no-memory", action="store_true", help="do not trace memory allocations")
+    parser.add_argument("--json", help="file to write the reports to")
+    parser.add_argument("--plan-cache", action="store_true",
+                        help="compare planning directly with planning through a PlanCache instead")
+    args = parser.parse_args()
+
+    reports = []
+    if args.plan_cache:
+        for name, hypergraph in shapes(args.seed):
+            report = plan_cache(name, hypergraph, args.max_width)
+            reports.append(report)
+            print("{:<16} direct={:.5f}s miss={:.5f}s hit={:.5f}s".format(name, report["direct"], report["miss"],
+                                                                          report["hit"]))
+
+    else:
+        for name, hypergraph, catalog in workloads(args.size, args.domain, args.skew, args.seed):
+            report = run(name, hypergraph, catalog, args.max_width, args.baseline_limit, not args.no_memory)
+            reports.append(report)
+
+            if "error" in report:
+                print("{:<16} {}".format(name, report["error"]))
+                continue
+
+            phases = " ".join("{}={:.4f}s".format(phase, measure["seconds"])
+                              for phase, measure in report["phases"].items())
+            peak = max((measure["peak_bytes"] or 0) for measure in report["phases"].values())
+            baseline = "{:.4f}s".format(report["baseline"]["seconds"]) if "baseline" in report else "skipped"
+            print("{:<16} count={:<10} peak={:.1f}KiB baseline={} {}".format(name, report["count"], peak / 1024,
+                                                                             baseline, phases))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
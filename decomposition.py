@@ -1,4 +1,5 @@
 import itertools
+from collections import defaultdict, deque
 
 from models.HyperGraph import HyperGraph
 
@@ -29,19 +30,37 @@ def v_path(hypergraph: HyperGraph,  v: set, path):
 
 
 def v_connected(hypergraph: HyperGraph,  v, variables):
-    for pair in itertools.combinations(variables, 2):
-        found = False
-        perms = itertools.permutations(hypergraph.get_variables())
-        for perm in perms:
-            if perm[0] == pair[0] and perm[-1] == pair[1]:
-                if v_path(hypergraph, v, perm):
-                    found = True
-                    break
-
-        if not found:
-            return False
+    """
+    Function to determine whether the given variables are [v]-connected, by
+    means of a breadth-first search over the edges from one of them.
 
-    return True
+    :param hypergraph: (HyperGraph) hypergraph to consider
+    :param v: (Set) set of variables
+    :param variables: (Iterable) variables to check
+    :return: True if the variables are [v]-connected, False otherwise
+    """
+    variables = set(variables)
+    if len(variables) < 2:
+        return True
+
+    incidence = defaultdict(list)
+    for edge in hypergraph.get_edges():
+        for x in edge.difference(v):
+            incidence[x].append(edge)
+
+    start = next(iter(variables))
+    reached = {start}
+    expanded = set()
+    queue = deque([start])
+    while queue:
+        for edge in incidence[queue.popleft()]:
+            if edge not in expanded:
+                expanded.add(edge)
+                for y in edge.difference(v).difference(reached):
+                    reached.add(y)
+                    queue.append(y)
+
+    return start not in v and variables.issubset(reached)
 
 
 def powerset(iterable):
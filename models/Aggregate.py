@@ -0,0 +1,120 @@
+from abc import ABC, abstractmethod
+
+
+class Aggregate(ABC):
+    """
+    Class that represents an aggregate over the results of a join as a
+    commutative semiring, such that it can be folded bottom-up through a
+    generalized join tree: alternatives for a subtree are combined by add,
+    the subtrees below a node by multiply. Every leaf tuple is lifted into
+    the semiring; the leaf owning the aggregated variable contributes its
+    value, the other leaves their multiplicity only.
+    """
+    def __init__(self, variable=None):
+        self._variable = variable
+
+    def get_variable(self):
+        return self._variable
+
+    @abstractmethod
+    def zero(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def lift(self, value, mult: int):
+        """
+        Function to map a tuple of a leaf into the semiring.
+
+        :param value: (object) value of the aggregated variable, None if the leaf does not own it.
+        :param mult: (int) multiplicity of the tuple.
+        :return: (object) element of the semiring.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def add(self, left, right):
+        raise NotImplementedError
+
+    @abstractmethod
+    def multiply(self, left, right):
+        raise NotImplementedError
+
+    def result(self, element):
+        return element
+
+
+class Count(Aggregate):
+    """
+    Class that represents COUNT(*), i.e., the number of join results
+    including duplicates, in the semiring of the integers.
+    """
+    def zero(self):
+        return 0
+
+    def lift(self, value, mult: int):
+        return mult
+
+    def add(self, left, right):
+        return left + right
+
+    def multiply(self, left, right):
+        return left * right
+
+
+class Sum(Aggregate):
+    """
+    Class that represents SUM(variable), in the semiring of pairs of a count
+    and a sum: the product of two sub-results repeats the sum of each one
+    for every result of the other.
+    """
+    def zero(self):
+        return 0, 0
+
+    def lift(self, value, mult: int):
+        return mult, 0 if value is None else mult * value
+
+    def add(self, left, right):
+        return left[0] + right[0], left[1] + right[1]
+
+    def multiply(self, left, right):
+        return left[0] * right[0], left[0] * right[1] + right[0] * left[1]
+
+    def result(self, element):
+        return element[1] if element[0] != 0 else None
+
+
+class Min(Aggregate):
+    """
+    Class that represents MIN(variable), in the semiring wherein both add and
+    multiply take the minimum, and None, i.e., the absence of a value, is
+    neutral. Multiplicities do not matter.
+    """
+    def zero(self):
+        return None
+
+    def lift(self, value, mult: int):
+        return value
+
+    def add(self, left, right):
+        if left is None:
+            return right
+        if right is None:
+            return left
+
+        return min(left, right)
+
+    def multiply(self, left, right):
+        return self.add(left, right)
+
+
+class Max(Min):
+    """
+    Class that represents MAX(variable), see Min.
+    """
+    def add(self, left, right):
+        if left is None:
+            return right
+        if right is None:
+            return left
+
+        return max(left, right)
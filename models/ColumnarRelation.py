@@ -0,0 +1,804 @@
+from collections import Counter
+from collections.abc import Mapping
+
+import numpy as np
+
+from models.IndexManager import IndexManager
+from models.Loader import CHUNK_SIZE, RelationReader
+from models.Relation import RelTuple, Schema
+
+
+def _concat(arrays):
+    """
+    Concatenate column chunks, ignoring empty chunks so that untyped
+    empty columns do not influence the resulting dtype. Chunks of different
+    kinds, e.g., numbers and text, are combined into an object column rather
+    than cast onto a common type.
+    """
+    arrays = [arr for arr in arrays if len(arr) > 0]
+    if len(arrays) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if len(arrays) == 1:
+        return arrays[0]
+
+    if len({arr.dtype.kind for arr in arrays}) > 1:
+        arrays = [arr.astype(object) for arr in arrays]
+
+    return np.concatenate(arrays)
+
+
+def _column(values: list, dtype=None):
+    """
+    Function to convert a list of values into a column without altering
+    them. When no dtype is given, values of a single type obtain the
+    matching numpy type, any other list becomes an object column.
+
+    :param values: (list) values of the column.
+    :param dtype: (numpy.dtype) optional type of the column.
+    :return: (numpy.ndarray) column holding the values.
+    """
+    if dtype is not None:
+        return np.asarray(values, dtype=dtype)
+
+    if len(values) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if len({type(value) for value in values}) == 1:
+        col = np.asarray(values)
+        if col.ndim == 1 and col.dtype.kind in "biufU":
+            return col
+
+    col = np.empty(len(values), dtype=object)
+    col[:] = values
+    return col
+
+
+def _parse_column(texts):
+    """
+    Function to infer the type of a column of raw text. The column is parsed
+    into integers or floating point numbers only if every value is the exact
+    representation of its number, e.g., "007" and "1e3" remain text, so
+    that parsing never loses information; the column remains text otherwise.
+
+    :param texts: (numpy.ndarray) raw text of the column.
+    :return: (numpy.ndarray) typed column.
+    """
+    distinct, inverse = np.unique(texts, return_inverse=True)
+    distinct = distinct.tolist()
+    for parse, candidate in ((int, np.int64), (float, np.float64)):
+        try:
+            parsed = [parse(text) for text in distinct]
+            if all(repr(value) == text for value, text in zip(parsed, distinct)):
+                return np.asarray(parsed, dtype=candidate)[inverse.reshape(-1)]
+        except (ValueError, OverflowError):
+            continue
+
+    return texts
+
+
+def _unique(col):
+    """
+    Function to find the distinct values of a column. Object columns, whose
+    values need not be comparable, are hashed rather than sorted.
+
+    :return: (tuple) distinct values and, for every row, the position of its value among them.
+    """
+    if col.dtype != object:
+        distinct, inverse = np.unique(col, return_inverse=True)
+        return distinct, inverse.reshape(-1)
+
+    positions = {}
+    inverse = np.fromiter((positions.setdefault(value, len(positions)) for value in col.tolist()),
+                          dtype=np.int64, count=len(col))
+    distinct = np.empty(len(positions), dtype=object)
+    for value, position in positions.items():
+        distinct[position] = value
+
+    return distinct, inverse
+
+
+def _group_codes(columns: list, size: int):
+    """
+    Function to assign a dense integer code to every row, such that two rows
+    obtain the same code if and only if they agree on all given columns.
+
+    :param columns: (list) columns to group on.
+    :param size: (int) number of rows.
+    :return: (tuple) array of codes and the number of distinct codes.
+    """
+    codes = np.zeros(size, dtype=np.int64)
+    groups = 1 if size > 0 else 0
+    for col in columns:
+        uniq, inverse = _unique(col)
+        # Re-compact after every column to keep the codes below size^2
+        distinct, codes = np.unique(codes * len(uniq) + inverse, return_inverse=True)
+        codes = codes.reshape(-1)
+        groups = len(distinct)
+
+    return codes, groups
+
+
+def _aggregate(codes, mult):
+    """
+    Function to sum the multiplicities per group.
+
+    :return: (tuple) row index of the first member of each group and the summed multiplicities.
+    """
+    order = np.argsort(codes, kind="stable")
+    starts = np.flatnonzero(np.r_[True, codes[order][1:] != codes[order][:-1]]) if len(order) else order
+    sums = np.add.reduceat(mult[order], starts) if len(order) else mult[:0]
+    return order[starts], sums
+
+
+def _last_occurrences(codes):
+    """
+    Function to retrieve, for every group, the row index of its last member.
+    """
+    _, last = np.unique(codes[::-1], return_index=True)
+    return np.sort(len(codes) - 1 - last)
+
+
+class ColumnarMultisetRelation:
+    """
+    Class that represents a multiset of relational tuples in columnar form,
+    i.e., one typed array per variable plus an array of multiplicities. It
+    exposes the same interface as MultisetRelation and can thus be stored in
+    a RelationalCatalog and plugged into a GeneralizedJoinTree.
+
+    Small deltas are applied in place: the multiplicities of existing rows
+    are overwritten, rows dropping to zero are kept until the next merge,
+    and new tuples are buffered along with their keys in every index. The
+    buffer is merged into the columns once it, together with the dropped
+    rows, outgrows the columns, or when the relation is read as a whole.
+    """
+    def __init__(self, name, variables: set, columns=None, multiplicities=None):
+        self._name = name
+        self._variables = set(variables)
+        self._order = sorted(self._variables)
+
+        if columns is None:
+            columns = {}
+        if multiplicities is None:
+            multiplicities = np.empty(0, dtype=np.int64)
+
+        self._mult = np.asarray(multiplicities, dtype=np.int64)
+        self._columns = {var: np.asarray(columns[var]) if var in columns else np.empty(0, dtype=np.int64)
+                         for var in self._order}
+        self._indexes = IndexManager()
+        self._index_vars = None
+        self._rows = None           # Row of every tuple in the columns, built on first use
+        self._pending = {}          # Buffered tuples, mapping their values onto their multiplicities
+        self._dead = 0              # Rows of the columns whose multiplicity dropped to zero
+
+    def get_variables(self):
+        return self._variables
+
+    def get_name(self):
+        return self._name
+
+    def set_name(self, name):
+        self._name = name
+
+    def get_column(self, variable):
+        self._flush()
+        return self._columns[variable]
+
+    def get_multiplicities(self):
+        self._flush()
+        return self._mult
+
+    def size(self):
+        return len(self._mult) - self._dead + len(self._pending)
+
+    def add(self, tuples: list):
+        """
+        Function to add tuples to the relation, given either as a list of
+        RelTuples or as a mapping from RelTuples to multiplicities.
+
+        :param tuples: (list) RelTuples to add.
+        """
+        changes = tuples if isinstance(tuples, Mapping) else Counter(tuples)
+        self._change(changes.items(), len(changes))
+
+    def remove(self, tuples: list):
+        """
+        Function to lower the multiplicity of the given RelTuples by one.
+
+        :param tuples: (list) RelTuples to remove.
+        """
+        changes = Counter(tuples)
+        self._change(((tup, -mult) for tup, mult in changes.items()), len(changes))
+
+    def apply(self, delta):
+        """
+        Function to apply a delta relation with signed multiplicities in place.
+        Tuples whose multiplicity drops to zero are removed. A delta that is
+        small compared to the relation only visits the affected tuples and
+        maintains the indexes along the way, a larger one is merged as a batch.
+
+        :param delta: (MultisetRelation) delta to apply.
+        """
+        if delta.size() == 0:
+            return
+
+        if delta.size() < self.size():
+            self._change(delta.generator(), delta.size())
+        else:
+            delta = _as_columnar(delta)
+            self._append(delta._columns, delta._mult)
+
+    def _change(self, changes, size: int):
+        """
+        Function to apply (RelTuple, multiplicity) pairs, i.e., size of them,
+        in place. Multiplicities of rows in the columns are overwritten, other
+        tuples are buffered, and the buffered tuples are added to the indexes.
+        """
+        if size == 0:
+            return
+
+        if size >= self.size():
+            changes = list(changes)
+            self._append(*ColumnarMultisetRelation._rows_to_columns(self._order, changes))
+            return
+
+        positions = self._positions()
+        schema = Schema.get(self._order)
+        extras = [(schema.projection(frozenset(key.get_variables()))[1], index[2]) for key, index
+                  in self._indexes.items()]
+        for tup, mult in changes:
+            if mult == 0:
+                continue
+
+            values = tup.get_values()
+            row = positions.get(values)
+            if row is not None:
+                old_mult = int(self._mult[row])
+                self._mult[row] = old_mult + mult
+                self._dead += (old_mult + mult == 0) - (old_mult == 0)
+                continue
+
+            old_mult = self._pending.get(values, 0)
+            if old_mult + mult != 0:
+                self._pending[values] = old_mult + mult
+            else:
+                del self._pending[values]
+
+            if old_mult == 0 or old_mult + mult == 0:
+                for gather, extra in extras:
+                    key = gather(values)
+                    if old_mult == 0:
+                        extra.setdefault(key, set()).add(values)
+                    else:
+                        extra[key].discard(values)
+                        if not extra[key]:
+                            del extra[key]
+
+        for key, _ in list(self._indexes.items()):
+            self._indexes.resize(key, len(self._mult) + len(self._pending))
+
+        if self._dead + len(self._pending) > len(self._mult):
+            self._flush()
+
+    def _flush(self):
+        """
+        Function to move the buffered tuples into the columns and to drop
+        the rows whose multiplicity dropped to zero. Indexes are rebuilt on
+        their next use.
+        """
+        if not self._pending and self._dead == 0:
+            return
+
+        live = np.flatnonzero(self._mult != 0)
+        pending = list(self._pending.items())
+        self._columns = {var: _concat([self._columns[var][live], _column([values[i] for values, _ in pending])])
+                         for i, var in enumerate(self._order)}
+        self._mult = _concat([self._mult[live], np.asarray([mult for _, mult in pending], dtype=np.int64)])
+        self._pending = {}
+        self._dead = 0
+        self._rows = None
+        self._indexes.clear()
+
+    def _append(self, columns: dict, mult):
+        """
+        Function to append a batch of rows, summing the multiplicities of duplicates.
+        """
+        self._flush()
+        merged = {var: _concat([self._columns[var], columns[var]]) for var in self._order}
+        merged_mult = _concat([self._mult, mult])
+        codes, _ = _group_codes([merged[var] for var in self._order], len(merged_mult))
+        rows, sums = _aggregate(codes, merged_mult)
+
+        live = sums != 0
+        self._columns = {var: col[rows[live]] for var, col in merged.items()}
+        self._mult = sums[live]
+        self._indexes.clear()
+        self._rows = None
+
+    @staticmethod
+    def _rows_to_columns(order: list, changes: list):
+        """
+        Function to convert (RelTuple, multiplicity) pairs into columns and multiplicities.
+        """
+        rows = [tup.project(order).get_values() for tup, _ in changes]
+        columns = {var: _column([row[i] for row in rows]) for i, var in enumerate(order)}
+        return columns, np.asarray([mult for _, mult in changes], dtype=np.int64)
+
+    def copy(self):
+        self._flush()
+        return ColumnarMultisetRelation(self._name, self._variables,
+                                        {var: col.copy() for var, col in self._columns.items()},
+                                        self._mult.copy())
+
+    def distinct(self):
+        """
+        Function to obtain the set of tuples in the relation, i.e., a copy
+        wherein every tuple has multiplicity one.
+
+        :return: (ColumnarMultisetRelation) with the distinct tuples.
+        """
+        rel = self.copy()
+        rel._mult = np.ones(self.size(), dtype=np.int64)
+        return rel
+
+    def print(self, dictionaries=None):
+        """
+        Function to print the tuples in the relation.
+
+        :param dictionaries: (Function) optional mapping from variables onto Dictionaries to decode the values.
+        """
+        rel = self.decode(dictionaries) if dictionaries else self
+        for tup, mult in rel.generator():
+            print(str(tup), mult)
+
+    def encode(self, dictionaries):
+        """
+        Function to replace the values of the columns by their dictionary
+        codes, translating every distinct value once.
+
+        :param dictionaries: (Function) mapping variables onto their Dictionaries.
+        :return: (ColumnarMultisetRelation) with encoded columns.
+        """
+        self._flush()
+        columns = {}
+        for var, col in self._columns.items():
+            distinct, inverse = _unique(col)
+            encode = dictionaries(var).encode
+            columns[var] = np.asarray([encode(value) for value in distinct.tolist()], dtype=np.int64)[inverse]
+
+        return ColumnarMultisetRelation(self._name, self._variables, columns, self._mult.copy())
+
+    def decode(self, dictionaries):
+        """
+        Function to replace the dictionary codes of the columns by their
+        values. Codes index the values of the dictionary directly, such that
+        the values are restored as they were encoded and every relation over
+        a domain obtains the same column type.
+
+        :param dictionaries: (Function) mapping variables onto their Dictionaries.
+        :return: (ColumnarMultisetRelation) with decoded columns.
+        """
+        self._flush()
+        columns = {var: _column(dictionaries(var).get_values())[col] for var, col in self._columns.items()}
+        return ColumnarMultisetRelation(self._name, self._variables, columns, self._mult.copy())
+
+    def generator(self):
+        """
+        Generator to iterate the tuples in the relation.
+
+        :return: (Generator) iterating the tuples in the relation.
+        """
+        self._flush()
+        schema = Schema.get(self._order)
+        columns = [self._columns[var].tolist() for var in self._order]
+        for row, mult in zip(zip(*columns) if columns else ([()] * self.size()), self._mult.tolist()):
+            yield RelTuple.from_values(schema, row), mult
+
+    def _select(self, rows, variables=None):
+        """
+        Function to create a new relation from a subset of rows.
+        """
+        if variables is None:
+            variables = self._variables
+
+        return ColumnarMultisetRelation("", variables, {var: self._columns[var][rows] for var in variables},
+                                        self._mult[rows])
+
+    def project(self, variables: set):
+        """
+        Function to project the tuples in the relation onto the given set of
+        variables. Multiplicities of tuples that coincide after projection
+        are summed.
+
+        :param variables: (set) variables to project on.
+        :return: (ColumnarMultisetRelation) obtained by projecting on given set of variables.
+        """
+        self._flush()
+        codes, _ = _group_codes([self._columns[var] for var in sorted(variables)], self.size())
+        rows, sums = _aggregate(codes, self._mult)
+
+        rel = self._select(rows, variables)
+        rel._mult = sums
+        return rel
+
+    def merge(self, right):
+        """
+        Function to obtain a new relation by merging the current one with the
+        given relation. Tuples present in both take the multiplicity of right.
+
+        :param right: (MultisetRelation) to merge with.
+        :return: (ColumnarMultisetRelation) obtained by merging.
+        """
+        self._flush()
+        right = _as_columnar(right)
+        columns = {var: _concat([self._columns[var], right._columns[var]]) for var in self._order}
+        mult = _concat([self._mult, right._mult])
+        codes, _ = _group_codes([columns[var] for var in self._order], len(mult))
+        rows = _last_occurrences(codes)
+
+        return ColumnarMultisetRelation("", self._variables, {var: col[rows] for var, col in columns.items()},
+                                        mult[rows])
+
+    def cart_prod(self, right):
+        """
+        Function to compute the cartesian product of the current relation with
+        the given relation. Shared variables take the value of right.
+
+        :param right: (MultisetRelation) to join with.
+        :return: (ColumnarMultisetRelation) obtained by joining.
+        """
+        self._flush()
+        right = _as_columnar(right)
+        left_rows = np.repeat(np.arange(self.size()), right.size())
+        right_rows = np.tile(np.arange(right.size()), self.size())
+
+        variables = self._variables.union(right.get_variables())
+        columns = {}
+        for var in variables:
+            if var in right._columns:
+                columns[var] = right._columns[var][right_rows]
+            else:
+                columns[var] = self._columns[var][left_rows]
+
+        rel = ColumnarMultisetRelation("", variables, columns, self._mult[left_rows] * right._mult[right_rows])
+        if self._variables.intersection(right.get_variables()):
+            codes, _ = _group_codes([rel._columns[var] for var in rel._order], rel.size())
+            rel = rel._select(_last_occurrences(codes))
+
+        return rel
+
+    def join(self, right):
+        """
+        Function to compute the natural join of the current relation with the
+        given relation, by means of a sort-based join on the shared variables.
+
+        :param right: (MultisetRelation) to join with.
+        :return: (ColumnarMultisetRelation) obtained by joining.
+        """
+        self._flush()
+        right = _as_columnar(right)
+        join_vars = sorted(self._variables.intersection(right.get_variables()))
+        columns = [_concat([self._columns[var], right._columns[var]]) for var in join_vars]
+        codes, groups = _group_codes(columns, self.size() + right.size())
+        left_codes, right_codes = codes[:self.size()], codes[self.size():]
+
+        # Every left row is matched with the contiguous range of right rows sharing its code
+        order = np.argsort(right_codes, kind="stable")
+        counts = np.bincount(right_codes, minlength=groups)
+        starts = np.cumsum(counts) - counts
+        matches = counts[left_codes]
+        left_rows = np.repeat(np.arange(self.size()), matches)
+        offsets = np.arange(len(left_rows)) - np.repeat(np.cumsum(matches) - matches, matches)
+        right_rows = order[np.repeat(starts[left_codes], matches) + offsets]
+
+        variables = self._variables.union(right.get_variables())
+        columns = {var: right._columns[var][right_rows] if var in right._columns else self._columns[var][left_rows]
+                   for var in variables}
+        return ColumnarMultisetRelation("", variables, columns, self._mult[left_rows] * right._mult[right_rows])
+
+    def semi_join(self, right):
+        """
+        Function to perform a left semi-join with the given relation. The
+        multiplicity of a surviving tuple is multiplied with the summed
+        multiplicity of its matching tuples in right.
+
+        :param right: (MultisetRelation) to semi-join with.
+        :return: (ColumnarMultisetRelation) obtained by performing left-semi join with right.
+        """
+        self._flush()
+        right = _as_columnar(right)
+        join_vars = sorted(self._variables.intersection(right.get_variables()))
+        columns = [_concat([self._columns[var], right._columns[var]]) for var in join_vars]
+        codes, groups = _group_codes(columns, self.size() + right.size())
+
+        right_mult = np.zeros(groups, dtype=np.int64)
+        np.add.at(right_mult, codes[self.size():], right._mult)
+        factor = right_mult[codes[:self.size()]]
+
+        rows = np.flatnonzero(factor > 0)
+        rel = self._select(rows)
+        rel._mult = self._mult[rows] * factor[rows]
+        return rel
+
+    def filter(self, right):
+        """
+        Function to perform a left semi-join with the given relation that
+        only filters, i.e., the multiplicities of the surviving tuples are
+        preserved.
+
+        :param right: (MultisetRelation) to semi-join with.
+        :return: (ColumnarMultisetRelation) with the tuples that have a match in right.
+        """
+        self._flush()
+        right = _as_columnar(right)
+        join_vars = sorted(self._variables.intersection(right.get_variables()))
+        columns = [_concat([self._columns[var], right._columns[var]]) for var in join_vars]
+        codes, groups = _group_codes(columns, self.size() + right.size())
+
+        matched = np.zeros(groups, dtype=bool)
+        matched[codes[self.size():][right._mult != 0]] = True
+        return self._select(np.flatnonzero(matched[codes[:self.size()]]))
+
+    def partition(self, variable, partitions: int):
+        """
+        Function to hash-partition the relation on the given variable, using
+        the same hash as MultisetRelation, such that equal values end up in
+        the same partition across relations.
+
+        :param variable: (String) variable to partition on.
+        :param partitions: (int) number of partitions.
+        :return: (list) ColumnarMultisetRelations, one per partition.
+        """
+        self._flush()
+        column = self._columns[variable]
+        hashes = np.fromiter(map(hash, column.tolist()), dtype=np.int64, count=len(column))
+        targets = np.mod(hashes, partitions)
+
+        parts = []
+        for part in range(partitions):
+            rel = self._select(np.flatnonzero(targets == part))
+            rel.set_name(self._name)
+            parts.append(rel)
+
+        return parts
+
+    def get_multiplicity(self, rel_tuple: RelTuple):
+        """
+        Function to retrieve the multiplicity of the given RelTuple in the relation.
+
+        :param rel_tuple: (RelTuple) to obtain the multiplicity of.
+        :return: (Number) representing the multiplicity of the tuple.
+        """
+        values = rel_tuple.get_values()
+        row = self._positions().get(values)
+        return int(self._mult[row]) if row is not None else self._pending.get(values, 0)
+
+    def _positions(self):
+        """
+        Function to map the values of every row of the columns onto its position, built on first use.
+        """
+        if self._rows is None:
+            columns = [self._columns[var].tolist() for var in self._order]
+            self._rows = dict(zip(zip(*columns) if columns else [()] * len(self._mult), range(len(self._mult))))
+
+        return self._rows
+
+    def total(self, rel_tuple: RelTuple):
+        """
+        Function to sum the multiplicities of the tuples that match the
+        given rel_tuple, making use of the index on its variables.
+
+        :param rel_tuple: (RelTuple) to match tuples against.
+        :return: (Number) total multiplicity of the matching tuples.
+        """
+        if len(rel_tuple.get_schema().get_variables()) == len(self._order):
+            return self.get_multiplicity(rel_tuple)
+
+        perm, ranges, extra = self._index(rel_tuple.get_schema())
+        start, stop = ranges.get(rel_tuple.get_values(), (0, 0))
+        pending = extra.get(rel_tuple.get_values(), ())
+        return int(self._mult[perm[start:stop]].sum()) + sum(self._pending[values] for values in pending)
+
+    def get_indexes(self):
+        return self._indexes
+
+    def create_index(self, variables: set):
+        """
+        Function to create an index of the relation on the given set of
+        variables, unless it exists already. Rows are sorted on the index
+        key, so that every key maps onto a contiguous range of rows. Indexes
+        are otherwise built on their first use, the one created last is the
+        one that is persisted along with the relation.
+
+        :param variables: (set) variables to create the index on.
+        """
+        self._index_vars = sorted(variables)
+        self._index(Schema.get(variables))
+
+    def _index(self, schema: Schema):
+        return self._indexes.get(schema, self._build_index)
+
+    def _build_index(self, schema: Schema):
+        """
+        Function to build an index over the variables of the schema. Rows of
+        the columns are sorted on the key, buffered tuples are kept per key.
+
+        :return: (tuple) index and its size.
+        """
+        key_vars = list(schema.get_variables())
+        codes, _ = _group_codes([self._columns[var] for var in key_vars], len(self._mult))
+        perm = np.argsort(codes, kind="stable")
+        sorted_codes = codes[perm]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]) if len(perm) else perm
+
+        extra = {}
+        gather = Schema.get(self._order).projection(frozenset(key_vars))[1]
+        for values in self._pending:
+            extra.setdefault(gather(values), set()).add(values)
+
+        return self._ranges(key_vars, perm, starts, extra), len(self._mult) + len(self._pending)
+
+    def _ranges(self, key_vars: list, perm, starts, extra=None):
+        """
+        Function to map every key onto its range in the permutation of the rows.
+
+        :return: (tuple) permutation, the mapping from keys to ranges and the buffered tuples per key.
+        """
+        stops = np.r_[starts[1:], len(perm)] if len(perm) else perm
+        keys = zip(*[self._columns[var][perm[starts]].tolist() for var in key_vars]) if key_vars \
+            else [()] * len(starts)
+        return perm, dict(zip(keys, zip(starts.tolist(), stops.tolist()))), {} if extra is None else extra
+
+    def set_index(self, key_vars: list, perm, starts):
+        """
+        Function to install an index that was computed before, e.g., as
+        persisted along with the relation.
+
+        :param key_vars: (list) sorted variables of the index key.
+        :param perm: (numpy.ndarray) permutation of the rows sorting them on the key.
+        :param starts: (numpy.ndarray) position in the permutation where the range of every key starts.
+        """
+        self._flush()
+        self._index_vars = list(key_vars)
+        self._indexes.put(Schema.get(key_vars), self._ranges(self._index_vars, perm, starts), len(perm))
+
+    def get_index(self):
+        """
+        Function to fetch the index that was created last, if any.
+
+        :return: (tuple) sorted key variables, permutation and range starts of the index, None if there is no index.
+        """
+        if self._index_vars is None:
+            return None
+
+        self._flush()
+        perm, ranges, _ = self._index(Schema.get(self._index_vars))
+        return self._index_vars, perm, np.sort(np.fromiter((start for start, _ in ranges.values()), dtype=np.int64,
+                                                           count=len(ranges)))
+
+    def retrieve(self, rel_tuple: RelTuple):
+        """
+        Function to retrieve tuples that match the given rel_tuple, making
+        use of the index on its variables.
+
+        :param rel_tuple: (RelTuple) to match tuples against.
+        :return: (ColumnarMultisetRelation) of matching tuples.
+        """
+        perm, ranges, extra = self._index(rel_tuple.get_schema())
+        start, stop = ranges.get(rel_tuple.get_values(), (0, 0))
+        rows = perm[start:stop]
+        rel = self._select(rows[self._mult[rows] != 0])
+        pending = [(values, self._pending[values]) for values in extra.get(rel_tuple.get_values(), ())]
+        if pending:
+            rel._columns = {var: _concat([rel._columns[var], _column([values[i] for values, _ in pending])])
+                            for i, var in enumerate(self._order)}
+            rel._mult = _concat([rel._mult, np.asarray([mult for _, mult in pending], dtype=np.int64)])
+
+        return rel
+
+    def lookup(self, rel_tuple: RelTuple):
+        """
+        Function to iterate the tuples that match the given rel_tuple, making
+        use of the index on its variables, without copying them into a new
+        relation.
+
+        :param rel_tuple: (RelTuple) to match tuples against.
+        :return: (Generator) of (RelTuple, multiplicity) pairs.
+        """
+        perm, ranges, extra = self._index(rel_tuple.get_schema())
+        start, stop = ranges.get(rel_tuple.get_values(), (0, 0))
+        rows = perm[start:stop]
+        rows = rows[self._mult[rows] != 0]
+
+        schema = Schema.get(self._order)
+        columns = [self._columns[var][rows].tolist() for var in self._order]
+        for row, mult in zip(zip(*columns) if columns else ([()] * len(rows)), self._mult[rows].tolist()):
+            yield RelTuple.from_values(schema, row), mult
+
+        for values in list(extra.get(rel_tuple.get_values(), ())):
+            yield RelTuple.from_values(schema, values), self._pending[values]
+
+    @staticmethod
+    def from_tuples(name, variables: set, tuples: list):
+        """
+        Function to build a relation from a list of RelTuples, each having multiplicity one.
+
+        :param name: (String) name of the relation.
+        :param variables: (set) variables of the relation.
+        :param tuples: (list) RelTuples of the relation.
+        :return: (ColumnarMultisetRelation) containing the tuples.
+        """
+        rel = ColumnarMultisetRelation(name, variables)
+        rel._append(*ColumnarMultisetRelation._rows_to_columns(rel._order, [(tup, 1) for tup in tuples]))
+        return rel
+
+    @staticmethod
+    def from_relation(relation, name=None):
+        """
+        Function to convert any relation exposing a generator into a ColumnarMultisetRelation.
+
+        :param relation: (MultisetRelation) relation to convert.
+        :param name: (String) optional name of the result, defaults to the name of relation.
+        :return: (ColumnarMultisetRelation) columnar variant of the relation.
+        """
+        if name is None:
+            name = relation.get_name()
+
+        # Intermediate results do not always track their variables, so they are taken from the tuples
+        tuples = list(relation.generator())
+        variables = set(tuples[0][0].get_schema().get_variables()) if tuples else relation.get_variables()
+
+        rel = ColumnarMultisetRelation(name, variables)
+        rel._append(*ColumnarMultisetRelation._rows_to_columns(rel._order, tuples))
+        return rel
+
+    @staticmethod
+    def from_file(name, file, types=None, delimiter=None, chunk_size=CHUNK_SIZE, infer=False):
+        """
+        Function to read a ColumnarMultisetRelation from a file. Function assumes
+        that the first line represents the header of the relation, i.e., it
+        should specify the variables that the relation defines. The file is
+        streamed in chunks, wherein duplicate rows are collapsed into a single
+        row with a higher multiplicity. As in MultisetRelation, values remain
+        strings unless their type is declared or inferred. Types are inferred
+        once per column, after all chunks have been read, and only if parsing
+        does not lose information.
+
+        :param name: (String) name of the relation.
+        :param file: (String) path to the, possibly compressed, file representing the relation.
+        :param types: (dict) optional mapping from variables to types, e.g., int or numpy types.
+        :param delimiter: (String) optional delimiter, derived from the extension of the file when absent.
+        :param chunk_size: (int) number of rows parsed at once.
+        :param infer: (bool) whether to infer the types of the columns that are not declared.
+        :return: (ColumnarMultisetRelation) as read from the file.
+        """
+        if types is None:
+            types = {}
+
+        chunks = []
+        with RelationReader(file, delimiter, chunk_size) as reader:
+            header = reader.get_header()
+            for rows in reader.chunks():
+                columns = {var: np.asarray([row[i] for row in rows], dtype=types.get(var, str))
+                           for i, var in enumerate(header)}
+                codes, _ = _group_codes([columns[var] for var in sorted(header)], len(rows))
+                first, mult = _aggregate(codes, np.ones(len(rows), dtype=np.int64))
+                chunks.append(({var: col[first] for var, col in columns.items()}, mult))
+
+        rel = ColumnarMultisetRelation(name, set(header))
+        if chunks:
+            columns = {var: _concat([columns[var] for columns, _ in chunks]) for var in header}
+            if infer:
+                columns = {var: col if var in types else _parse_column(col) for var, col in columns.items()}
+
+            rel._append(columns, _concat([mult for _, mult in chunks]))
+
+        return rel
+
+
+def _as_columnar(relation):
+    if isinstance(relation, ColumnarMultisetRelation):
+        relation._flush()
+        return relation
+
+    return ColumnarMultisetRelation.from_relation(relation)
@@ -0,0 +1,57 @@
+class Dictionary:
+    """
+    Class that maps the values of a domain onto dense integer codes, in the
+    order in which they are first encountered, and back. Relations encoded
+    with the same dictionary can be joined on the codes directly, which
+    hashes and compares small integers rather than strings.
+    """
+    def __init__(self):
+        self._codes = {}
+        self._values = []
+
+    @staticmethod
+    def from_values(values: list):
+        """
+        Function to restore a Dictionary from its values, in the order of their codes.
+
+        :param values: (list) values of the Dictionary.
+        :return: (Dictionary) assigning every value its position as code.
+        """
+        dictionary = Dictionary()
+        for value in values:
+            dictionary.encode(value)
+
+        return dictionary
+
+    def encode(self, value):
+        """
+        Function to obtain the code of a value, assigning a new code to unseen values.
+
+        :param value: (object) value to encode.
+        :return: (int) code of the value.
+        """
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self._values)
+            self._codes[value] = code
+            self._values.append(value)
+
+        return code
+
+    def lookup(self, value):
+        """
+        Function to obtain the code of a value without extending the dictionary.
+
+        :param value: (object) value to look up.
+        :return: (int) code of the value, None if the value was never encoded.
+        """
+        return self._codes.get(value)
+
+    def decode(self, code: int):
+        return self._values[code]
+
+    def get_values(self):
+        return self._values
+
+    def size(self):
+        return len(self._values)
@@ -0,0 +1,224 @@
+from collections import Counter
+
+from models.Relation import MultisetRelation, RelTuple
+
+
+class Union:
+    """
+    Class that represents the union of the alternatives for a subtree of a
+    generalized join tree, given the tuple of its parent. Unions are shared
+    by every parent tuple that agrees on the pvar of the subtree.
+    """
+    def __init__(self, products: list):
+        self._products = products
+        self._count = None
+
+    def get_products(self):
+        return self._products
+
+    def count(self):
+        """
+        Function to count the join results represented, including duplicates.
+
+        :return: (int) sum of the counts of the alternatives.
+        """
+        if self._count is None:
+            self._count = sum(product.count() for product in self._products)
+
+        return self._count
+
+    def generator(self):
+        for product in self._products:
+            yield from product.generator()
+
+
+class Product:
+    """
+    Class that represents the product of a tuple with the unions of the
+    subtrees below it. The tuple of a leaf contributes its values and its
+    multiplicity, that of an interior node neither, as its values occur at
+    the leaves below it.
+    """
+    def __init__(self, rel_tuple: RelTuple, mult: int, factors: list):
+        self._tuple = rel_tuple
+        self._mult = mult
+        self._factors = factors
+
+    def get_tuple(self):
+        return self._tuple
+
+    def get_multiplicity(self):
+        return self._mult
+
+    def get_factors(self):
+        return self._factors
+
+    def count(self):
+        count = self._mult
+        for factor in self._factors:
+            count *= factor.count()
+
+        return count
+
+    def generator(self):
+        return self._expand(0, self._tuple, self._mult)
+
+    def _expand(self, position: int, rel_tuple: RelTuple, mult: int):
+        """
+        Generator to combine the tuple with one result of every factor from the given position on.
+        """
+        if position == len(self._factors):
+            yield rel_tuple, mult
+            return
+
+        for tup, tup_mult in self._factors[position].generator():
+            yield from self._expand(position + 1, rel_tuple.join(tup), mult * tup_mult)
+
+
+class Factorization:
+    """
+    Class that represents the results of a join as a d-representation, i.e.,
+    a directed acyclic graph of unions and products whose sub-results are
+    shared, rather than as a flat relation. Its size is linear in the
+    relations of the generalized join tree it was derived from, whereas the
+    number of results it represents may be exponential in it.
+    """
+    def __init__(self, root: Union, variables: set):
+        self._root = root
+        self._variables = variables
+
+    @staticmethod
+    def from_join_tree(root, decode=None):
+        """
+        Function to factorize the results of a generalized join tree, which
+        requires the semi-join reduction to have been performed. Every node
+        contributes one Union per distinct key over its pvar.
+
+        :param root: (GeneralizedTreeNode) root of the tree.
+        :param decode: (Function) optional function decoding the tuples of the leaves.
+        :return: (Factorization) of the results of the join.
+        """
+        unions = {}
+        variables = set()
+
+        def union(node, key: RelTuple):
+            if (id(node), key) in unions:
+                return unions[(id(node), key)]
+
+            leaf = len(node.get_children()) == 0
+            products = []
+            for tup, mult in node.get_relation().lookup(key):
+                if leaf:
+                    products.append(Product(decode(tup) if decode is not None else tup, mult, []))
+                else:
+                    factors = [union(child, tup.project(child.get_pvar())) for child in node.get_children()]
+                    products.append(Product(RelTuple.empty(), 1, factors))
+
+            unions[(id(node), key)] = Union(products)
+            return unions[(id(node), key)]
+
+        for node in root.preorder():
+            if len(node.get_children()) == 0:
+                variables.update(node.get_label().get_variables())
+
+        return Factorization(union(root, RelTuple.empty()), variables)
+
+    def get_root(self):
+        return self._root
+
+    def get_variables(self):
+        return self._variables
+
+    def count(self):
+        return self._root.count()
+
+    def size(self):
+        """
+        Function to measure the representation, rather than the results it represents.
+
+        :return: (int) number of distinct unions and products.
+        """
+        return len(self._nodes())
+
+    def generator(self):
+        """
+        Generator to iterate the join results represented.
+
+        :return: (Generator) iterating (RelTuple, multiplicity) pairs.
+        """
+        return self._root.generator()
+
+    def to_relation(self, name=""):
+        """
+        Function to flatten the representation into a relation.
+
+        :param name: (String) name of the relation.
+        :return: (MultisetRelation) of the join results.
+        """
+        counts = Counter()
+        for tup, mult in self.generator():
+            counts[tup] += mult
+
+        relation = MultisetRelation(name, set(self._variables))
+        relation.add({tup: mult for tup, mult in counts.items() if mult != 0})
+        return relation
+
+    def _nodes(self):
+        """
+        Function to list the distinct unions and products, every node after the nodes it refers to.
+
+        :return: (list) unions and products.
+        """
+        nodes = []
+        visited = set()
+
+        def visit(node):
+            if id(node) in visited:
+                return
+
+            visited.add(id(node))
+            for child in node.get_products() if isinstance(node, Union) else node.get_factors():
+                visit(child)
+            nodes.append(node)
+
+        visit(self._root)
+        return nodes
+
+    def serialize(self):
+        """
+        Function to serialize the representation in a format that can be
+        written as JSON, given values that can. Shared nodes are written once
+        and referred to by their position.
+
+        :return: (dict) variables, nodes and the position of the root.
+        """
+        nodes = self._nodes()
+        position = {id(node): pos for pos, node in enumerate(nodes)}
+        serialized = []
+        for node in nodes:
+            if isinstance(node, Union):
+                serialized.append({"union": [position[id(product)] for product in node.get_products()]})
+            else:
+                serialized.append({"tuple": dict(node.get_tuple().get_attributes()),
+                                   "multiplicity": node.get_multiplicity(),
+                                   "product": [position[id(factor)] for factor in node.get_factors()]})
+
+        return {"variables": sorted(self._variables), "nodes": serialized, "root": position[id(self._root)]}
+
+    @staticmethod
+    def deserialize(data: dict):
+        """
+        Function to restore a representation from its serialization.
+
+        :param data: (dict) as produced by serialize.
+        :return: (Factorization) sharing the nodes as the original did.
+        """
+        nodes = []
+        for node in data["nodes"]:
+            if "union" in node:
+                nodes.append(Union([nodes[pos] for pos in node["union"]]))
+            else:
+                nodes.append(Product(RelTuple(node["tuple"]), node["multiplicity"],
+                                     [nodes[pos] for pos in node["product"]]))
+
+        return Factorization(nodes[data["root"]], set(data["variables"]))
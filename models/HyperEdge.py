@@ -23,4 +23,20 @@ class HyperEdge:
         return HyperEdge("", self._variables, False)
 
     def __str__(self):
-        return self.get_label() + "(" + str(self._variables) + ")"
\ No newline at end of file
+        return self.get_label() + "(" + str(self._variables) + ")"
+
+
+class BagEdge(HyperEdge):
+    """
+    Class that represents a bag of a hypertree decomposition that is guarded
+    by one or more hyperedges. The bag behaves as an atom whose relation is
+    the natural join of the relations of its guards, projected on the
+    variables of the bag.
+    """
+    def __init__(self, guards: list, variables: set):
+        label = "*".join(guard.get_label() for guard in guards) + "[" + ",".join(sorted(variables)) + "]"
+        super().__init__(label, variables)
+        self._guards = guards
+
+    def get_guards(self):
+        return self._guards
@@ -1,22 +1,156 @@
 import itertools
-from collections import defaultdict
+import random
+from collections import OrderedDict, defaultdict, deque
 
-from models.HyperEdge import HyperEdge
+from models.HyperEdge import BagEdge, HyperEdge
 from models.JoinTree import TreeNode, JoinTree
 
 
-def _powerset(iterable):
-    s = list(iterable)
-    return itertools.chain.from_iterable(itertools.combinations(s, r) for r in range(len(s) + 1))
+class PositionCache:
+    """
+    Class that memoizes the outcome of positions in the marshals and robbers
+    game, keyed on the robbers' component and the variables occupied by the
+    marshals. Won and lost positions are kept in separate caches, each of
+    which can be bounded in size, evicting the least recently used position.
+    """
+    def __init__(self, max_size=None):
+        self._max_size = max_size
+        self._success = OrderedDict()
+        self._failure = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key):
+        """
+        Function to look up the outcome of a position.
+
+        :param key: (tuple) key of the position.
+        :return: (tuple) whether the position is known and its outcome.
+        """
+        for cache in (self._success, self._failure):
+            if key in cache:
+                cache.move_to_end(key)
+                self._hits += 1
+                return True, cache[key]
+
+        self._misses += 1
+        return False, None
+
+    def put(self, key, outcome):
+        """
+        Function to store the outcome of a position.
+
+        :param key: (tuple) key of the position.
+        :param outcome: (TreeNode) decomposition of the position, False if the robbers escape.
+        """
+        cache = self._success if outcome else self._failure
+        cache[key] = outcome
+        if self._max_size is not None and len(cache) > self._max_size:
+            cache.popitem(last=False)
+
+    def get_hits(self):
+        return self._hits
+
+    def get_misses(self):
+        return self._misses
+
+    def clear(self):
+        self._success.clear()
+        self._failure.clear()
 
 
 class HyperGraph:
     """
     Class that represents a hypergraph.
     """
-    def __init__(self, variables: set, hyper_edges: set):
+    def __init__(self, variables: set, hyper_edges: set, cache_size=None):
         self._variables = variables
         self._hyper_edges = hyper_edges
+        self._cache = PositionCache(cache_size)
+        self._intern()
+
+    def _intern(self):
+        """
+        Function to create the bitset encoding of the hypergraph: every
+        variable is assigned a bit position, every hyperedge is encoded as a
+        mask over these bits and every variable as a mask over the hyperedges
+        it occurs in.
+        """
+        self._edge_list = list(self._hyper_edges)
+        self._edge_masks = []
+        self._bits = {}
+        self._incidence = defaultdict(int)
+
+        for var in self._variables:
+            self._bits[var] = 1 << len(self._bits)
+
+        for pos, edge in enumerate(self._edge_list):
+            mask = 0
+            for var in self._edge_variables(edge):
+                if var not in self._bits:
+                    self._bits[var] = 1 << len(self._bits)
+                mask |= self._bits[var]
+                self._incidence[var] |= 1 << pos
+            self._edge_masks.append(mask)
+
+        self._bit_vars = {bit.bit_length() - 1: var for var, bit in self._bits.items()}
+
+    @staticmethod
+    def _edge_variables(edge):
+        """
+        Function to obtain the variables of a hyperedge. Hyperedges may also
+        be given as plain sets of variables, as in decomposition.py.
+        """
+        if isinstance(edge, (set, frozenset)):
+            return edge
+
+        return edge.get_variables()
+
+    def _mask(self, variables):
+        """
+        Function to encode a set of variables as a bitmask.
+        """
+        mask = 0
+        for var in variables:
+            mask |= self._bits[var]
+
+        return mask
+
+    def _unmask(self, mask: int):
+        """
+        Function to decode a bitmask into a set of variables.
+        """
+        variables = set()
+        while mask:
+            low = mask & -mask
+            variables.add(self._bit_vars[low.bit_length() - 1])
+            mask ^= low
+
+        return variables
+
+    def _touching(self, mask: int):
+        """
+        Function to retrieve the bitmask of the hyperedges that share a variable with the given mask.
+        """
+        edges = 0
+        while mask:
+            low = mask & -mask
+            edges |= self._incidence[self._bit_vars[low.bit_length() - 1]]
+            mask ^= low
+
+        return edges
+
+    def _union(self, edges: int):
+        """
+        Function to compute the mask of the variables covered by the given bitmask of hyperedges.
+        """
+        mask = 0
+        while edges:
+            low = edges & -edges
+            mask |= self._edge_masks[low.bit_length() - 1]
+            edges ^= low
+
+        return mask
 
     def get_vertices(self):
         """
@@ -36,6 +170,9 @@ class HyperGraph:
         """
         return self._hyper_edges
 
+    def get_cache(self):
+        return self._cache
+
     def get_primal_graph(self):
         """
         Function to retrieve the primal graph of the
@@ -44,14 +181,10 @@ class HyperGraph:
         :return: (HyperGraph) hypergraph modeling the primal graph
         """
         edges = set()
-
-        # Can also be achieved by looping the edges and creating combi's of the edges
-        for perm in itertools.combinations(self._variables, 2):
-            edge = {perm[0], perm[1]}
-            for hyper_edge in self._hyper_edges:
-                if edge.issubset(hyper_edge.get_variables()):
-                    edges.add(frozenset(edge))
-                    break
+        for var in self._variables:
+            neighbours = self._union(self._incidence[var]) & ~self._bits[var]
+            for other in self._unmask(neighbours):
+                edges.add(frozenset({var, other}))
 
         return Graph(self._variables, edges)
 
@@ -63,11 +196,10 @@ class HyperGraph:
 
         :return: (bool) True if a is v-adjacent to b, False otherwise
         """
-        for hyper_edge in self._hyper_edges:
-            if {a, b}.issubset(hyper_edge.get_variables().difference(v)):
-                return True
+        if a in v or b in v:
+            return False
 
-        return False
+        return (self._incidence[a] & self._incidence[b]) != 0
 
     def v_path(self, v: set, sequence: list):
         """
@@ -82,29 +214,64 @@ class HyperGraph:
 
         return True
 
+    def v_components(self, v: set, starts=None):
+        """
+        Function to compute the [v]-components of the hypergraph, i.e., the
+        maximal sets of vertices outside v that are pairwise connected by a
+        v-path.
+
+        :param v: (set) subset of vertices.
+        :param starts: (iterable) optional vertices to restrict the search to
+        the components containing them, defaults to all vertices.
+        :return: (list) of [v]-components
+        """
+        if starts is None:
+            starts = self._variables
+
+        components = self._components(self._mask(v), self._mask(starts))
+        return [self._unmask(component) for component in components]
+
+    def _components(self, v: int, starts: int):
+        """
+        Function to compute the [v]-components containing the given variables
+        on the bitset encoding, by means of a breadth-first search that
+        expands every hyperedge at most once.
+
+        :param v: (int) mask of the separating variables.
+        :param starts: (int) mask of the variables to start from.
+        :return: (list) masks of the [v]-components
+        """
+        components = []
+        expanded = 0
+        starts &= ~v
+        while starts:
+            component = frontier = starts & -starts
+            while frontier:
+                edges = self._touching(frontier) & ~expanded
+                expanded |= edges
+                frontier = self._union(edges) & ~v & ~component
+                component |= frontier
+
+            components.append(component)
+            starts &= ~component
+
+        return components
+
     def v_connected(self, v: set, w: set):
         """
         Function to determine whether the given subset of vertices
         w is v-connected, given a subset of vertices v.
 
-        :return: (bool) True if w is a v-component, False otherwise
+        :return: (bool) True if w is v-connected, False otherwise
         """
-        perms = itertools.combinations(w, 2)
-        primal_graph = self.get_primal_graph()
-        for perm in perms:
-            found = False
-            paths = primal_graph.gen_paths(perm[0], perm[1])
-
-            for path in paths:
-                # Verify whether path is a v-path
-                if self.v_path(v, path):
-                    found = True
-                    break
+        if len(w) < 2:
+            return True
 
-            if not found:
-                return False
+        start = next(iter(w))
+        if start in v:
+            return False
 
-        return True
+        return w.issubset(self.v_components(v, [start])[0])
 
     def v_component(self, v: set, w: set):
         """
@@ -113,18 +280,10 @@ class HyperGraph:
 
         :return: (bool) True if w is a v-component, False otherwise
         """
-        if not w.issubset(self._variables.difference(v)):
+        if len(w) == 0 or not w.issubset(self._variables.difference(v)):
             return False
 
-        if not self.v_connected(v, w):
-            return False
-
-        # Check maximality
-        for var in self._variables.difference(w).difference(v):
-            if self.v_connected(v, w.union(var)):
-                return False
-
-        return True
+        return self.v_components(v, [next(iter(w))])[0] == w
 
     def edges(self, c: set):
         """
@@ -133,13 +292,8 @@ class HyperGraph:
 
         :return: (set) set of edges
         """
-        edges = set()
-
-        for edge in self._hyper_edges:
-            if c.intersection(edge.get_variables()):
-                edges.add(edge)
-
-        return edges
+        edges = self._touching(self._mask(c))
+        return {edge for pos, edge in enumerate(self._edge_list) if edges >> pos & 1}
 
     def decomposable(self, c_robbers: set, marshals: set):
         """
@@ -148,56 +302,257 @@ class HyperGraph:
 
         :return: (boolean) True if 1-decomposable, False otherwise
         """
-        for move in self._hyper_edges:
-            # Check if robbers can't escape
-            if not self._enclosed(c_robbers, marshals, move):
+        occupied = self._mask(var for edge in marshals for var in edge.get_variables())
+        return bool(self._join_tree_rec(self._mask(c_robbers), occupied))
+
+    def is_acyclic(self):
+        """
+        Function to determine whether the hypergraph is alpha-acyclic,
+        by means of the GYO reduction.
+
+        :return: (boolean) True if acyclic, False otherwise
+        """
+        return self.join_tree_gyo() is not None
+
+    def join_tree(self, max_width=1):
+        """
+        Function to retrieve the join tree of the hypergraph. The GYO
+        reduction is attempted first, the marshals and robbers game is
+        only played when it fails, with an increasing number of marshals
+        up to max_width.
+
+        :param max_width: (int) maximal number of hyperedges guarding a bag.
+        :return: (JoinTree) representing the join tree
+        """
+        join_tree = self.join_tree_gyo()
+        if join_tree is not None:
+            return join_tree
+
+        for width in range(1, max_width + 1):
+            join_tree = self.hypertree_decomposition(width)
+            if join_tree is not None:
+                return join_tree
+
+        return JoinTree(False)
+
+    def join_trees(self, limit=8):
+        """
+        Generator to enumerate distinct join trees of an acyclic hypergraph.
+        A hypergraph is acyclic if and only if the maximum weight spanning
+        trees of its intersection graph, wherein a pair of hyperedges weighs
+        the number of variables they share, are its join trees. Spanning
+        trees are built by Kruskal's algorithm, breaking ties between pairs
+        of equal weight differently in every attempt.
+
+        :param limit: (int) maximal number of join trees to enumerate.
+        :return: (Generator) iterating JoinTrees, rooted at an arbitrary hyperedge.
+        """
+        if len(self._hyper_edges) == 0 or not self.is_acyclic():
+            return
+
+        edges = sorted(self._hyper_edges, key=lambda edge: edge.get_label())
+        pairs = [(len(edges[i].get_variables() & edges[j].get_variables()), i, j)
+                 for i, j in itertools.combinations(range(len(edges)), 2)]
+
+        seen = set()
+        tiebreak = random.Random(0)
+        for _ in range(4 * limit):
+            ranks = {pair: tiebreak.random() for pair in pairs} if seen else {pair: 0 for pair in pairs}
+            parent = list(range(len(edges)))
+
+            def find(i):
+                while parent[i] != i:
+                    parent[i] = parent[parent[i]]
+                    i = parent[i]
+                return i
+
+            tree = []
+            for pair in sorted(pairs, key=lambda pair: (-pair[0], ranks[pair])):
+                _, i, j = pair
+                if find(i) != find(j):
+                    parent[find(i)] = find(j)
+                    tree.append((i, j))
+
+            key = frozenset(tree)
+            if key in seen:
                 continue
 
-            # Check if robbers area decreased
-            if not c_robbers.intersection(move.get_variables()):
+            seen.add(key)
+            neighbours = defaultdict(list)
+            for i, j in tree:
+                neighbours[i].append(j)
+                neighbours[j].append(i)
+
+            yield JoinTree(self._rooted_tree(edges, neighbours, 0, None))
+            if len(seen) == limit:
+                return
+
+    @staticmethod
+    def _rooted_tree(edges: list, neighbours: dict, current: int, previous):
+        return TreeNode(edges[current], [HyperGraph._rooted_tree(edges, neighbours, neighbour, current)
+                                         for neighbour in neighbours[current] if neighbour != previous])
+
+    def hypertree_decomposition(self, width: int):
+        """
+        Function to compute a hypertree decomposition of the given width by
+        playing the game with k marshals, i.e., every move occupies up to
+        width hyperedges. Bags that do not coincide with a single hyperedge
+        are labeled by a BagEdge, whose relation is to be materialized from
+        its guards (see JoinTree.materialize). Hyperedges that do not label a
+        node are attached as a child of a bag covering them, such that
+        every hyperedge contributes its multiplicities exactly once.
+
+        :param width: (int) maximal number of hyperedges guarding a bag.
+        :return: (JoinTree) representing the decomposition, None if none exists
+        """
+        root = self._join_tree_rec(self._mask(self._variables), 0, width)
+        if not root:
+            return None
+
+        root = root.copy()
+        nodes = root.preorder()
+        labels = {node.get_label() for node in nodes}
+        for edge in self._edge_list:
+            if edge in labels:
                 continue
 
-            # Check if components can be decomposed
-            valid = True
-            for comp in self._gen_components(move, c_robbers):
-                if not self.decomposable(comp, {move}):
-                    valid = False
-                    break
+            cover = next((node for node in nodes if edge.get_variables().issubset(node.get_label().get_variables())),
+                         None)
+            if cover is None:
+                return None
+            cover.add_child(TreeNode(edge))
 
-            if valid:
-                return True
+        return JoinTree(root)
 
-        return False
+    def join_tree_gyo(self):
+        """
+        Function to compute a join tree by means of the GYO reduction, i.e.,
+        by repeatedly removing variables that occur in a single hyperedge and
+        hyperedges whose remaining variables are contained in another one.
+        A removed hyperedge becomes a child of the hyperedge containing it.
 
-    def join_tree(self):
+        :return: (JoinTree) representing the join tree, None if the hypergraph is cyclic
         """
-        Function to retrieve the join tree of the hypergraph.
+        if len(self._hyper_edges) == 0:
+            return None
 
-        :return: (JoinTree) representing the join tree
+        nodes = {edge: TreeNode(edge) for edge in self._hyper_edges}
+        remaining = {edge: set(edge.get_variables()) for edge in self._hyper_edges}
+        incidence = defaultdict(set)
+        for edge, variables in remaining.items():
+            for var in variables:
+                incidence[var].add(edge)
+
+        alive = set(self._hyper_edges)
+        queue = deque(self._hyper_edges)
+        while queue and len(alive) > 1:
+            edge = queue.popleft()
+            if edge not in alive:
+                continue
+
+            # Remove variables that no other hyperedge refers to
+            for var in [var for var in remaining[edge] if len(incidence[var]) == 1]:
+                remaining[edge].discard(var)
+                del incidence[var]
+
+            witness = self._gyo_witness(edge, remaining, incidence, alive)
+            if witness is None:
+                continue
+
+            alive.discard(edge)
+            nodes[witness].add_child(nodes[edge])
+            for var in remaining[edge]:
+                incidence[var].discard(edge)
+                if len(incidence[var]) == 1:
+                    queue.extend(incidence[var])
+
+        if len(alive) > 1:
+            return None
+
+        return JoinTree(nodes[next(iter(alive))])
+
+    @staticmethod
+    def _gyo_witness(edge: HyperEdge, remaining: dict, incidence: dict, alive: set):
+        """
+        Function to find a hyperedge containing the remaining variables of the given hyperedge.
+
+        :return: (HyperEdge) containing the remaining variables, None if no such hyperedge exists
         """
-        return JoinTree(self._join_tree_rec(self._variables, set()))
+        if len(remaining[edge]) == 0:
+            return next(other for other in alive if other is not edge)
 
-    def _join_tree_rec(self, c_robbers: set, marshals: set):
+        var = min(remaining[edge], key=lambda v: len(incidence[v]))
+        for other in incidence[var]:
+            if other is not edge and remaining[edge].issubset(remaining[other]):
+                return other
+
+        return None
+
+    def _join_tree_rec(self, c_robbers: int, marshals: int, width=1):
         """
         Function to compute the join-tree of the hypergraph.
 
+        :param c_robbers: (int) mask of the robbers' component.
+        :param marshals: (int) mask of the variables occupied by the marshals.
+        :param width: (int) number of marshals.
         :return: (TreeNode) representing the root of the join tree
         """
-        for move in self._hyper_edges:
+        key = (c_robbers, marshals, width)
+        found, outcome = self._cache.get(key)
+        if found:
+            return outcome
+
+        outcome = self._play(c_robbers, marshals, width)
+        self._cache.put(key, outcome)
+        return outcome
+
+    def _moves(self, width: int):
+        """
+        Generator to iterate the moves of the marshals, i.e., sets of up to
+        width hyperedges, skipping sets that occupy the same variables as an
+        earlier move.
+
+        :return: (Generator) iterating the hyperedges and variable mask of every move.
+        """
+        seen = set()
+        for size in range(1, width + 1):
+            for positions in itertools.combinations(range(len(self._edge_list)), size):
+                mask = 0
+                for pos in positions:
+                    mask |= self._edge_masks[pos]
+
+                if mask in seen:
+                    continue
+                seen.add(mask)
+
+                yield [self._edge_list[pos] for pos in positions], mask
+
+    def _play(self, c_robbers: int, marshals: int, width=1):
+        """
+        Function to search for a winning move of the marshals in the given position.
+
+        :return: (TreeNode) representing the root of the join tree, False if none exists
+        """
+        # Variables of the marshals that the robbers could escape through
+        boundary = self._union(self._touching(c_robbers)) & marshals
+
+        for move, mask in self._moves(width):
             # Check if robbers can't escape
-            if not self._enclosed(c_robbers, marshals, move):
+            if boundary & ~mask:
                 continue
 
             # Check if robbers area decreased
-            if not c_robbers.intersection(move.get_variables()):
+            if not c_robbers & mask:
                 continue
 
             # Check if components can be decomposed
             valid = True
-            components = self._gen_components(move, c_robbers)
             children = []
-            for comp in components:
-                comp = self._join_tree_rec(comp, {move})
+            for comp in self._components(mask, c_robbers & ~mask):
+                if comp & ~c_robbers:
+                    continue
+
+                comp = self._join_tree_rec(comp, mask, width)
                 if not comp:
                     valid = False
                     break
@@ -205,25 +560,24 @@ class HyperGraph:
                 children.append(comp)
 
             if valid:
-                return TreeNode(move, children)
+                # The bag only retains the variables of the robbers' area and the boundary
+                bag = mask & (c_robbers | marshals)
+                if len(move) == 1 and bag == mask:
+                    return TreeNode(move[0], children)
+
+                return TreeNode(BagEdge(move, self._unmask(bag)), children)
 
         return False
 
     def _gen_components(self, move: HyperEdge, c_robbers: set):
         """
-        Function to generate all [move]-components.
-        DISCLAIMER: Can be done way more efficiently.
+        Function to generate all [move]-components within the robbers area.
 
         :return: (list) of [move]-components
         """
-        components = []
-
-        for comp in _powerset(self._variables):
-            s_comp = set(comp)
-            if self.v_component(move.get_variables(), s_comp) and s_comp.issubset(c_robbers) and len(s_comp) > 0:
-                components.append(s_comp)
-
-        return components
+        robbers = self._mask(c_robbers)
+        mask = self._mask(move.get_variables())
+        return [self._unmask(comp) for comp in self._components(mask, robbers & ~mask) if not comp & ~robbers]
 
     def _enclosed(self, c_robbers: set, marshals, move: HyperEdge):
         """
@@ -232,12 +586,9 @@ class HyperGraph:
 
         :return: (boolean) True if enclosed, false otherwise
         """
-        flat_set = {item for sublist in marshals for item in sublist.get_variables()}
-        for edge in self.edges(c_robbers):
-            if not flat_set.intersection(edge.get_variables()).issubset(move.get_variables()):
-                return False
-
-        return True
+        occupied = self._mask(var for edge in marshals for var in edge.get_variables())
+        boundary = self._union(self._touching(self._mask(c_robbers))) & occupied
+        return not boundary & ~self._mask(move.get_variables())
 
 
 class Graph(HyperGraph):
@@ -250,6 +601,10 @@ class Graph(HyperGraph):
         self._vertex_index = defaultdict(set)
         self._prep()
 
+    @staticmethod
+    def _edge_variables(edge):
+        return edge
+
     def _prep(self):
         """
         Function to create the index-structures for
@@ -0,0 +1,157 @@
+from collections import OrderedDict
+
+
+class IndexBudget:
+    """
+    Class that bounds the size of the indexes of several relations, e.g.,
+    all relations of a RelationalCatalog. The size of an index is measured
+    in the number of tuples it refers to. Once the budget is exceeded, the
+    least recently used indexes are evicted; they are rebuilt when they are
+    used again.
+    """
+    def __init__(self, capacity: int):
+        self._capacity = capacity
+        self._used = 0
+        self._entries = OrderedDict()
+        self._evictions = 0
+
+    def charge(self, manager, variables, size: int):
+        """
+        Function to account for an index that was built or resized, evicting
+        other indexes while the budget is exceeded.
+
+        :param manager: (IndexManager) holding the index.
+        :param variables: (Schema) schema of the key of the index.
+        :param size: (int) number of tuples referred to by the index.
+        """
+        key = (id(manager), variables)
+        if key in self._entries:
+            self._used -= self._entries.pop(key)[1]
+
+        self._entries[key] = (manager, size)
+        self._used += size
+        while self._used > self._capacity and len(self._entries) > 1:
+            (_, evicted), (owner, _) = next(iter(self._entries.items()))
+            self.release(owner, evicted)
+            owner.drop(evicted)
+            self._evictions += 1
+
+    def touch(self, manager, variables):
+        key = (id(manager), variables)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+
+    def release(self, manager, variables):
+        entry = self._entries.pop((id(manager), variables), None)
+        if entry is not None:
+            self._used -= entry[1]
+
+    def get_capacity(self):
+        return self._capacity
+
+    def get_used(self):
+        return self._used
+
+    def get_evictions(self):
+        return self._evictions
+
+    def __getstate__(self):
+        # Indexes are not shipped along with a budget, hence neither are their charges
+        return {"_capacity": self._capacity, "_used": 0, "_entries": OrderedDict(), "_evictions": 0}
+
+
+class IndexManager:
+    """
+    Class that keeps several indexes of a relation, keyed by the Schema of
+    their key, i.e., the set of variables they are built on. Indexes are built on their first use by
+    the function the relation passes along, and optionally charged to an
+    IndexBudget shared with other relations.
+    """
+    def __init__(self, budget=None):
+        self._indexes = {}
+        self._sizes = {}
+        self._budget = budget
+
+    def get(self, variables, build):
+        """
+        Function to fetch the index on the given variables, building it if needed.
+
+        :param variables: (Schema) schema of the key of the index.
+        :param build: (Function) mapping the schema onto the index and its size.
+        :return: (object) index, as built by the relation.
+        """
+        index = self._indexes.get(variables)
+        if index is None:
+            index, size = build(variables)
+            self.put(variables, index, size)
+
+        elif self._budget is not None:
+            self._budget.touch(self, variables)
+
+        return index
+
+    def put(self, variables, index, size: int):
+        """
+        Function to install an index that was built beforehand.
+
+        :param variables: (Schema) schema of the key of the index.
+        :param index: (object) index, as built by the relation.
+        :param size: (int) number of tuples referred to by the index.
+        """
+        self._indexes[variables] = index
+        self._sizes[variables] = size
+        if self._budget is not None:
+            self._budget.charge(self, variables, size)
+
+    def peek(self, variables):
+        return self._indexes.get(variables)
+
+    def items(self):
+        return self._indexes.items()
+
+    def resize(self, variables, size: int):
+        """
+        Function to account for an index that grew or shrunk through maintenance.
+        """
+        if variables not in self._indexes:
+            return
+
+        self._sizes[variables] = size
+        if self._budget is not None:
+            self._budget.charge(self, variables, size)
+
+    def drop(self, variables):
+        self._indexes.pop(variables, None)
+        self._sizes.pop(variables, None)
+
+    def clear(self):
+        """
+        Function to discard all indexes, e.g., as the relation was replaced wholesale.
+        """
+        if self._budget is not None:
+            for variables in self._indexes:
+                self._budget.release(self, variables)
+
+        self._indexes = {}
+        self._sizes = {}
+
+    def get_budget(self):
+        return self._budget
+
+    def set_budget(self, budget):
+        """
+        Function to charge the indexes to another budget.
+
+        :param budget: (IndexBudget) budget to charge, None for an unbounded one.
+        """
+        indexes, sizes = self._indexes, self._sizes
+        self.clear()
+        self._budget = budget
+        self._indexes, self._sizes = indexes, sizes
+        if budget is not None:
+            for variables, size in list(sizes.items()):
+                budget.charge(self, variables, size)
+
+    def __getstate__(self):
+        # The budget covers the relations of one process only
+        return {"_indexes": self._indexes, "_sizes": self._sizes, "_budget": None}
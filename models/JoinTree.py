@@ -1,5 +1,12 @@
-from models.HyperEdge import HyperEdge
+import time
+from collections import Counter, defaultdict
+from itertools import combinations
+
+from models.Aggregate import Aggregate, Count
+from models.Factorized import Factorization
+from models.HyperEdge import BagEdge, HyperEdge
 from models.Relation import MultisetRelation, RelationalCatalog, RelTuple
+from models.TrieJoin import LeapfrogTrieJoin
 
 
 class TreeNode:
@@ -34,11 +41,32 @@ class TreeNode:
             return self
 
         for child in self._children:
-            if child.contains(variables):
-                return child
+            node = child.contains(variables)
+            if node:
+                return node
 
         return None
 
+    def copy(self):
+        """
+        Function to copy the structure of the subtree rooted at this node.
+
+        :return: (TreeNode) root of the copy, sharing the labels of the original.
+        """
+        return TreeNode(self._label, [child.copy() for child in self._children])
+
+    def preorder(self):
+        """
+        Function to list the nodes of the subtree rooted at this node in pre-order.
+
+        :return: (list) nodes of the subtree, parents before their children.
+        """
+        nodes = [self]
+        for child in self._children:
+            nodes.extend(child.preorder())
+
+        return nodes
+
     def serialize(self):
         return [str(self._label), [child.serialize() for child in self._children]]
 
@@ -51,11 +79,11 @@ class GeneralizedTreeNode(TreeNode):
 
         self._lambda = None         # Live tuples
         self._psi = None            # Live tuples projected on pvar
-        self._gamma = None          # Natural join of non-guards
-        self._gamma_indices = []
+        self._gamma = None          # Guard tuples, including dangling ones
+        self._filtered = None       # Live tuples that survived the top-down pass, if performed
 
     def get_relation(self):
-        return self._lambda
+        return self._filtered if self._filtered is not None else self._lambda
 
     def get_guard(self):
         return self._guard
@@ -67,23 +95,42 @@ class GeneralizedTreeNode(TreeNode):
         return set()
 
     def get_non_guards(self):
-        return set(self.get_children()).difference(self._guard)
+        return [child for child in self.get_children() if child is not self._guard]
+
+    def get_parent(self):
+        return self._parent
 
     def set_parent(self, parent):
         self._parent = parent
 
-    def initialize(self, catalog: RelationalCatalog):
+    def set_guard(self, guard):
+        self._guard = guard
+
+    def initialize(self, catalog: RelationalCatalog, profiler=None):
         """
         Function to assign MultiRelations to the generalized join
         join tree, leaf nodes are assigned atoms whereas interior
         nodes are assigned projections of these atomic tables.
 
         :param catalog: (RelationalCatalog) wherein base tables are stored.
+        :param profiler: (Profiler) optional profiler to record the work of every node with.
         """
-        if len(self._children) > 0:
-            for child in self._children:
-                child.initialize(catalog)
+        for child in self._children:
+            child.initialize(catalog, profiler)
+
+        tuples_in = self._guard.get_relation().size() if len(self._children) > 0 else None
+        self._profile(profiler, "initialize", lambda: self.initialize_node(catalog), tuples_in,
+                      lambda _: self._lambda.size())
 
+    def initialize_node(self, catalog: RelationalCatalog):
+        """
+        Function to assign the relations of this node, assuming that its
+        children have been initialized.
+
+        :param catalog: (RelationalCatalog) wherein base tables are stored.
+        """
+        self._filtered = None
+        if len(self._children) > 0:
             self._lambda = self._guard.get_relation().project(self._label.get_variables())
             self._gamma = self._guard._psi.copy()
 
@@ -92,54 +139,230 @@ class GeneralizedTreeNode(TreeNode):
 
         self._psi = self._lambda.project(self.get_pvar())
 
-    def semi_join_reduction(self):
+    def semi_join_reduction(self, profiler=None):
         """
         Function to perform a bottom up semi-join reduction as defined in
-        the first stage of the Yannakakis algorithm.
+        the first stage of the Yannakakis algorithm. Afterwards, the
+        multiplicity of a live tuple equals the number of join results of
+        the subtree that extend it.
+
+        :param profiler: (Profiler) optional profiler to record the work of every node with.
         """
         for child in self._children:
-            child.semi_join_reduction()
+            child.semi_join_reduction(profiler)
 
-        if self._parent is not None:
-            self._parent._lambda = self._parent._lambda.semi_join(self._lambda)
+        self.reduce_node(profiler)
+
+    def reduce_node(self, profiler=None):
+        """
+        Function to perform the semi-join reduction of this node, assuming
+        that its children have been reduced.
+
+        :param profiler: (Profiler) optional profiler to record the work with.
+        """
+        def reduce():
+            self._filtered = None
+            if len(self._children) > 0:
+                self._gamma = self._guard._psi.copy()
+                self._lambda = self._gamma.copy()
+                for child in self.get_non_guards():
+                    self._lambda = self._lambda.semi_join(child._psi)
+
+            self._psi = self._lambda.project(self.get_pvar())
+
+        if len(self._children) > 0:
+            tuples_in = sum(child._psi.size() for child in self._children)
+        else:
+            tuples_in = self._lambda.size()
+
+        self._profile(profiler, "semi_join_reduction", reduce, tuples_in, lambda _: self._lambda.size())
+        self._create_index(profiler)
+
+    def filter_node(self, profiler=None):
+        """
+        Function to perform the top-down semi-join of this node with its
+        parent, assuming that the parent has been filtered already. Tuples
+        without a live parent tuple are removed, the multiplicities of the
+        others are preserved as they count the extensions in the subtree.
+        The result is kept as a separate view on the live tuples, such that
+        the relations of the bottom-up pass remain available to updates.
+
+        :param profiler: (Profiler) optional profiler to record the work with.
+        """
+        def filter():
+            self._filtered = self._lambda.filter(self._parent.get_relation())
+
+        self._profile(profiler, "filter", filter, self._lambda.size(), lambda _: self._filtered.size())
+        self._create_index(profiler)
+
+    def drop_filter(self):
+        """
+        Function to discard the view of the top-down pass, e.g., as an update made it stale.
+        """
+        self._filtered = None
+
+    def _create_index(self, profiler=None):
+        """
+        Function to index the live tuples on pvar, for the parent to look them up.
+        The index refers to every live tuple and has one key per tuple of psi.
+        """
+        relation = self.get_relation()
+        self._profile(profiler, "index", lambda: relation.create_index(self.get_pvar()), relation.size(),
+                      lambda _: self._psi.size())
+
+    def _profile(self, profiler, phase: str, work, tuples_in=None, tuples_out=None):
+        """
+        Function to perform work of this node, measured by the profiler if any, see Profiler.measure.
+        """
+        if profiler is None:
+            return work()
+
+        return profiler.measure(self, phase, work, tuples_in, tuples_out)
 
-        self._lambda.create_index(self.get_pvar())
+    def aggregate(self, aggregate: Aggregate, owner, value):
+        """
+        Recursive function to fold an aggregate over the join results of the
+        subtree, grouped by the pvar of this node. Only the live tuples of
+        interior nodes are visited, each one multiplying the sub-results of
+        its children, such that the fold takes time linear in the relations.
+
+        :param aggregate: (Aggregate) semiring to fold.
+        :param owner: (GeneralizedTreeNode) leaf whose tuples contribute the value of the aggregated variable.
+        :param value: (Function) mapping a tuple of the owner onto the value of the aggregated variable.
+        :return: (dict) mapping tuples over pvar onto elements of the semiring.
+        """
+        pvar = self.get_pvar()
+        result = {}
+        if len(self._children) == 0:
+            for tup, mult in self._lambda.generator():
+                element = aggregate.lift(value(tup) if self is owner else None, mult)
+                key = tup.project(pvar)
+                result[key] = aggregate.add(result[key], element) if key in result else element
+
+            return result
+
+        children = [(child.aggregate(aggregate, owner, value), child.get_pvar()) for child in self._children]
+        for tup, _ in self._lambda.generator():
+            element = None
+            for sub_results, child_pvar in children:
+                child_key = tup.project(child_pvar)
+                if child_key not in sub_results:
+                    break
 
-    def enumerate(self, rel_tup: RelTuple):
+                sub_result = sub_results[child_key]
+                element = sub_result if element is None else aggregate.multiply(element, sub_result)
+            else:
+                key = tup.project(pvar)
+                result[key] = aggregate.add(result[key], element) if key in result else element
+
+        return result
+
+    def enumerate(self, rel_tup: RelTuple, profiler=None):
         """
         Recursive function to iterate the final join results from the
         generalized join tree.
 
         :param rel_tup: (RelTuple)
+        :param profiler: (Profiler) optional profiler to record the work of every node with.
         :return: (MultisetRelation) result of the join as computed by the join tree.
         """
+        return self._profile(profiler, "enumerate", lambda: self._enumerate(rel_tup, profiler), None,
+                             lambda result: result.size())
+
+    def _enumerate(self, rel_tup: RelTuple, profiler=None):
+        """
+        Function to enumerate the join results of the subtree that extend the given tuple.
+        """
         pvar = self.get_pvar()
         if len(self.get_children()) > 0:
             result = MultisetRelation("", set())
-            for tup, mult in self._lambda.retrieve(rel_tup.project(pvar)).generator():
+            for tup, mult in self.get_relation().retrieve(rel_tup.project(pvar)).generator():
                 temp = None
                 for child in self._children:
                     if temp is None:
-                        temp = child.enumerate(tup)
+                        temp = child.enumerate(tup, profiler)
                     else:
-                        temp = temp.cart_prod(child.enumerate(tup))
+                        temp = temp.cart_prod(child.enumerate(tup, profiler))
 
                 # Merge results for each lookup
                 result = result.merge(temp)
 
             return result
 
-        return self._lambda.retrieve(rel_tup.project(pvar))
+        return self.get_relation().retrieve(rel_tup.project(pvar))
 
-    def update(self, update: RelationalCatalog):
+    def update(self, update: RelationalCatalog, profiler=None):
+        """
+        Function to propagate a batch of changes to the base relations
+        bottom-up through the tree (dynamic Yannakakis). Only tuples affected
+        by the changes are revisited, and the indexes are maintained along
+        the way. Requires the semi-join reduction to have been performed.
+
+        :param update: (RelationalCatalog) delta relations with signed multiplicities.
+        :param profiler: (Profiler) optional profiler to record the work of every node with.
+        :return: (MultisetRelation) delta of the live tuples projected on pvar, None if unaffected.
+        """
+        deltas = [child.update(update, profiler) for child in self._children]
+        if len(self._children) > 0:
+            tuples_in = sum(delta.size() for delta in deltas if delta is not None)
+        elif update.contains(self._label.get_label()):
+            tuples_in = update.get(self._label.get_label()).size()
+        else:
+            return None
+
+        return self._profile(profiler, "update", lambda: self.update_node(update, deltas), tuples_in,
+                             lambda delta: delta.size() if delta is not None else 0)
+
+    def update_node(self, update: RelationalCatalog, deltas: list):
+        """
+        Function to propagate the changes to this node, given the deltas of its children.
+
+        :param update: (RelationalCatalog) delta relations with signed multiplicities.
+        :param deltas: (list) deltas of the children, in order, None for unaffected children.
+        :return: (MultisetRelation) delta of the live tuples projected on pvar, None if unaffected.
+        """
         pvar = self.get_pvar()
-        for child in self._children:
-            child.update(update)
+        if len(self._children) == 0:
+            delta_l = update.get(self._label.get_label())
+            self._lambda.apply(delta_l)
+
+        else:
+            affected = set()
+
+            delta_g = deltas[self._children.index(self._guard)]
+            if delta_g is not None:
+                self._gamma.apply(delta_g)
+                affected.update(tup for tup, _ in delta_g.generator())
+
+            # Gamma keeps an index on the pvar of every non-guard, maintained by apply
+            non_guards = self.get_non_guards()
+            for child in non_guards:
+                delta_c = deltas[self._children.index(child)]
+                if delta_c is not None:
+                    for key, _ in delta_c.generator():
+                        affected.update(tup for tup, _ in self._gamma.lookup(key))
+
+            if not affected:
+                return None
+
+            pvars = [frozenset(child.get_pvar()) for child in non_guards]
+            changes = {}
+            for tup in affected:
+                mult = self._gamma.get_multiplicity(tup)
+                for child, child_pvar in zip(non_guards, pvars):
+                    if mult == 0:
+                        break
+                    mult *= child._psi.get_multiplicity(tup.project(child_pvar))
+
+                if mult != self._lambda.get_multiplicity(tup):
+                    changes[tup] = mult - self._lambda.get_multiplicity(tup)
 
-        if self.get_label().is_atom():
-            delta_l = update.get(self.get_label().get_label())
+            delta_l = MultisetRelation("", self._label.get_variables(), changes)
+            self._lambda.apply(delta_l)
 
-        delta_p = delta_l.project(var)
+        delta_p = delta_l.project(pvar)
+        self._psi.apply(delta_p)
+        return delta_p
 
 
 class JoinTree:
@@ -185,6 +408,50 @@ class JoinTree:
 
         return None
 
+    def reroot(self, node: TreeNode):
+        """
+        Function to obtain the join tree rooted at the given node. The edges
+        of the tree are kept, only their direction changes.
+
+        :param node: (TreeNode) node of the tree to become the root.
+        :return: (JoinTree) rooted at a copy of the node, sharing the labels of the original.
+        """
+        neighbours = defaultdict(list)
+        for parent in self._root.preorder():
+            for child in parent.get_children():
+                neighbours[id(parent)].append(child)
+                neighbours[id(child)].append(parent)
+
+        def build(current, previous):
+            return TreeNode(current.get_label(), [build(neighbour, current) for neighbour in neighbours[id(current)]
+                                                  if neighbour is not previous])
+
+        return JoinTree(build(node, None))
+
+    def materialize(self, catalog: RelationalCatalog):
+        """
+        Function to materialize the relations of the bags of a hypertree
+        decomposition as the natural join of the relations of their guards,
+        computed by Leapfrog Triejoin and projected on the variables of the
+        bag, and to add them to the catalog
+        under the label of the bag. Bags only restrict the join, every tuple
+        has multiplicity one as the guards occur as nodes in the tree as well.
+        Updates of the guards are propagated to the bags by
+        GeneralizedJoinTree.update.
+
+        :param catalog: (RelationalCatalog) wherein base tables are stored.
+        """
+        if not self._root:
+            return
+
+        for node in self._root.preorder():
+            label = node.get_label()
+            if isinstance(label, BagEdge) and not catalog.contains(label.get_label()):
+                guards = [catalog.get(guard.get_label()) for guard in label.get_guards()]
+                relation = LeapfrogTrieJoin(guards).evaluate().project(label.get_variables()).distinct()
+                relation.set_name(label.get_label())
+                catalog.add(relation, encoded=True)
+
     def generalize(self):
         """
         Function to transform the join tree to a generalized join tree.
@@ -199,22 +466,471 @@ class JoinTree:
 class GeneralizedJoinTree(JoinTree):
     def __init__(self, root=None):
         super().__init__(root)
+        self._catalog = None
+        self._fully_reduced = False
+        self._statistics = {}
+        self._profiler = None
+        self._supports = {}
+
+    def get_catalog(self):
+        return self._catalog
+
+    def set_catalog(self, catalog: RelationalCatalog):
+        self._catalog = catalog
+
+    def get_profiler(self):
+        return self._profiler
+
+    def set_profiler(self, profiler):
+        """
+        Function to record the work of every node in the phases of the tree.
+
+        :param profiler: (Profiler) profiler to record with, None to stop profiling.
+        """
+        self._profiler = profiler
 
     def initialize(self, catalog: RelationalCatalog):
-        if self._root:
-            self._root.initialize(catalog)
+        """
+        Function to initialize the tree from the base relations in the catalog.
+        The catalog is kept to decode the results, if its relations are encoded.
 
-    def semi_join_reduction(self):
+        :param catalog: (RelationalCatalog) wherein base tables are stored.
+        """
+        self._catalog = catalog
         if self._root:
-            self._root.semi_join_reduction()
+            self._root.initialize(catalog, self._profiler)
+
+    def semi_join_reduction(self, full=False):
+        """
+        Function to perform the bottom-up semi-join reduction and, optionally,
+        the top-down pass of the full reducer. Both passes record how many
+        tuples they removed and how long they took, such that the top-down
+        pass can be skipped when it does not pay off, e.g., as the results
+        are enumerated lazily and only partially.
+
+        :param full: (bool) whether to perform the top-down pass as well.
+        """
+        if not self._root:
+            return
+
+        self._measure("bottom-up", lambda: self._root.semi_join_reduction(self._profiler))
+        self._fully_reduced = False
+        if full:
+            self.full_reduction()
+
+    def full_reduction(self):
+        """
+        Function to perform the top-down pass of the full reducer, assuming
+        that the bottom-up reduction has been performed. Afterwards, every
+        live tuple of every node takes part in at least one join result, such
+        that enumeration never follows a lookup that leads nowhere.
+        """
+        if not self._root:
+            return
+
+        def top_down():
+            for node in self._root.preorder()[1:]:
+                node.filter_node(self._profiler)
+
+        self._measure("top-down", top_down)
+        self._fully_reduced = True
+
+    def _measure(self, name: str, reduction):
+        """
+        Function to perform a pass of the reduction, recording the number of
+        live tuples it removed, the number remaining and its duration.
+        """
+        before = self._live_tuples()
+        start = time.perf_counter()
+        reduction()
+        seconds = time.perf_counter() - start
+        after = self._live_tuples()
+        self._statistics[name] = {"removed": before - after, "remaining": after, "seconds": seconds}
+
+    def _live_tuples(self):
+        return sum(node.get_relation().size() for node in self._root.preorder()
+                   if node.get_relation() is not None)
+
+    def get_reduction_statistics(self):
+        """
+        Function to fetch the statistics of the passes of the last reduction.
+
+        :return: (dict) mapping the names of the passes onto the tuples removed and remaining, and the seconds taken.
+        """
+        return self._statistics
+
+    def is_fully_reduced(self):
+        return self._fully_reduced
+
+    def explain_analyze(self):
+        """
+        Function to render the metrics recorded by the profiler on top of the
+        structure of the tree, e.g., after initializing, reducing and
+        enumerating, to find the nodes responsible for a slow query.
+
+        :return: (String) one line per node and one per phase it took part in.
+        """
+        if self._profiler is None:
+            raise ValueError("The tree is not profiled, see set_profiler")
+
+        if not self._root:
+            return ""
+
+        return self._profiler.explain(self._root)
 
     def enumerate(self):
         if self._root:
-            return self._root.enumerate(RelTuple.empty())
+            result = self._root.enumerate(RelTuple.empty(), self._profiler)
+            return self._catalog.decode(result) if self._catalog is not None else result
+
+    def aggregate(self, aggregate: Aggregate):
+        """
+        Function to compute an aggregate over the results of the join without
+        enumerating them, by folding its semiring bottom-up through the tree.
+        COUNT is read off the psi of the root, whose multiplicity the
+        reduction and the updates maintain. Requires the semi-join reduction
+        to have been performed; encoded values are decoded before they are
+        aggregated.
+
+        :param aggregate: (Aggregate) e.g., Count(), Sum("A"), Min("A") or Max("A").
+        :return: (object) value of the aggregate, None if it is undefined for an empty result.
+        """
+        if not self._root:
+            return None
+
+        if isinstance(aggregate, Count):
+            return sum(mult for _, mult in self._root._psi.generator())
+
+        variable = aggregate.get_variable()
+        owner = next((node for node in self._root.preorder() if len(node.get_children()) == 0
+                      and variable in node.get_label().get_variables()), None)
+        if owner is None:
+            raise ValueError("Variable {} does not occur in the join".format(variable))
+
+        if self._catalog is not None and self._catalog.is_encoding():
+            dictionary = self._catalog.get_dictionary(variable)
+            value = lambda tup: dictionary.decode(tup.get(variable))
+        else:
+            value = lambda tup: tup.get(variable)
+
+        result = self._root.aggregate(aggregate, owner, value)
+        return aggregate.result(result.get(RelTuple.empty(), aggregate.zero()))
+
+    def factorize(self):
+        """
+        Function to represent the results of the join compactly, as unions
+        and products of sub-results shared between the tuples of a node that
+        agree on the pvar of a child, rather than flattening them as
+        enumerate does. Requires the semi-join reduction to have been
+        performed; encoded tuples are decoded.
+
+        :return: (Factorization) of the results of the join, None for an empty tree.
+        """
+        if not self._root:
+            return None
+
+        decode = self._catalog.decode_tuple if self._catalog is not None and self._catalog.is_encoding() else None
+        return Factorization.from_join_tree(self._root, decode)
+
+    def iter_results(self):
+        """
+        Generator to stream the results of the join with constant delay,
+        without materializing them. Keeps one cursor per node, iterating the
+        index bucket that matches the current tuple of its parent, and
+        requires the semi-join reduction to have been performed. Encoded
+        results are decoded as they are emitted. When profiled, every lookup
+        and every step of a cursor is measured as the stream phase of its node.
+
+        :return: (Generator) iterating (RelTuple, multiplicity) pairs.
+        """
+        if self._catalog is None or not self._catalog.is_encoding():
+            yield from self._iter_encoded()
+            return
+
+        decode = self._catalog.decode_tuple
+        for tup, mult in self._iter_encoded():
+            yield decode(tup), mult
+
+    def _iter_encoded(self):
+        """
+        Generator to stream the results of the join, as stored in the tree.
+        """
+        if not self._root:
+            return
+
+        nodes = self._root.preorder()
+        position = {id(node): pos for pos, node in enumerate(nodes)}
+        parents = [position[id(node._parent)] if node._parent is not None else None for node in nodes]
+        pvars = [frozenset(node.get_pvar()) for node in nodes]
+        leaves = [len(node.get_children()) == 0 for node in nodes]
+
+        # partial[i] holds the join of the leaf tuples chosen before position i
+        current = [None] * len(nodes)
+        partial = [None] * (len(nodes) + 1)
+        partial[0] = (RelTuple.empty(), 1)
+        cursors = [self._open(nodes[0], RelTuple.empty())] + [None] * (len(nodes) - 1)
+
+        i = 0
+        while i >= 0:
+            entry = self._step(nodes[i], cursors[i])
+            if entry is None:
+                i -= 1
+                continue
+
+            tup, mult = entry
+            current[i] = tup
+            if leaves[i]:
+                acc, acc_mult = partial[i]
+                partial[i + 1] = (acc.join(tup), acc_mult * mult)
+            else:
+                partial[i + 1] = partial[i]
+
+            if i + 1 == len(nodes):
+                yield partial[i + 1]
+            else:
+                i += 1
+                key = current[parents[i]].project(pvars[i])
+                cursors[i] = self._open(nodes[i], key)
+
+    def _open(self, node: GeneralizedTreeNode, key: RelTuple):
+        """
+        Function to open a cursor on the live tuples of a node that match the key.
+        """
+        if self._profiler is None:
+            return iter(node.get_relation().lookup(key))
+
+        return self._profiler.measure(node, "stream", lambda: iter(node.get_relation().lookup(key)), 1)
+
+    def _step(self, node: GeneralizedTreeNode, cursor):
+        """
+        Function to advance a cursor of a node.
+
+        :return: (tuple) next (RelTuple, multiplicity) pair, None if the cursor is exhausted.
+        """
+        if self._profiler is None:
+            return next(cursor, None)
+
+        return self._profiler.measure(node, "stream", lambda: next(cursor, None), None,
+                                      lambda entry: 0 if entry is None else 1)
 
     def update(self, update: RelationalCatalog):
-        if self._root:
-            return self._root.update(update)
+        """
+        Function to maintain the tree under a batch of inserts and deletes,
+        given as delta relations with signed multiplicities. Deltas for an
+        encoding catalog have to be encoded by it, see RelationalCatalog.encode.
+
+        As the top-down pass drops tuples that updates may revive, its views
+        are discarded, whereas the relations of the bottom-up pass it leaves
+        intact are maintained incrementally. The deltas
+        of the bags of a hypertree decomposition are derived from those of
+        their guards, see _bag_delta. The statistics of the catalog are kept
+        up to date with the deltas.
+
+        :param update: (RelationalCatalog) delta relations, keyed by the name of the base relation.
+        """
+        if not self._root:
+            return
+
+        if self._fully_reduced:
+            for node in self._root.preorder():
+                node.drop_filter()
+            self._fully_reduced = False
+
+        update = self._with_bag_deltas(update)
+        self._root.update(update, self._profiler)
+
+        if self._catalog is not None and self._catalog.has_statistics():
+            names = {node.get_label().get_label() for node in self._root.preorder() if len(node.get_children()) == 0}
+            for name in names:
+                if update.contains(name):
+                    self._catalog.record(name, update.get(name))
+
+    def _with_bag_deltas(self, update: RelationalCatalog):
+        """
+        Function to extend a batch of deltas with the deltas of the bags
+        whose guards it changes, computed before any of them is applied.
+
+        :param update: (RelationalCatalog) delta relations of the base relations.
+        :return: (RelationalCatalog) the given deltas along with those of the bags.
+        """
+        leaves = [node.get_label() for node in self._root.preorder() if len(node.get_children()) == 0]
+        bags = {label.get_label(): label for label in leaves if isinstance(label, BagEdge)
+                and any(update.contains(guard.get_label()) for guard in label.get_guards())}
+        if not bags:
+            return update
+
+        names = {label.get_label() for label in leaves}
+        names.update(guard.get_label() for bag in bags.values() for guard in bag.get_guards())
+
+        extended = RelationalCatalog()
+        for name in names:
+            if update.contains(name):
+                extended.add(update.get(name))
+
+        for name, bag in bags.items():
+            delta = self._bag_delta(bag, update)
+            delta.set_name(name)
+            extended.add(delta)
+
+        return extended
+
+    def _bag_delta(self, bag: BagEdge, update: RelationalCatalog):
+        """
+        Function to compute the delta of the relation of a bag from the deltas
+        of its guards. The bag keeps the support of each of its tuples, i.e.,
+        the number of join results of the guards that project onto it, of
+        which the delta is the sum of the joins wherein a non-empty subset of
+        the changed guards is replaced by its delta and the others keep their
+        current relations. These joins are evaluated by index lookups starting
+        from the deltas. A tuple enters the bag when its support becomes
+        positive and leaves it when its support drops to zero. The supports
+        are counted once, on the first update of the bag.
+
+        :param bag: (BagEdge) bag whose guards are changed by the update.
+        :param update: (RelationalCatalog) delta relations of the base relations, not yet applied.
+        :return: (MultisetRelation) delta of the relation of the bag.
+        """
+        variables = frozenset(bag.get_variables())
+        relations = [self._catalog.get(guard.get_label()) for guard in bag.get_guards()]
+        support = self._supports.get(bag.get_label())
+        if support is None:
+            support = LeapfrogTrieJoin(relations).evaluate().project(set(variables))
+            self._supports[bag.get_label()] = support
+
+        changed = [pos for pos, guard in enumerate(bag.get_guards()) if update.contains(guard.get_label())]
+        changes = Counter()
+        for size in range(1, len(changed) + 1):
+            for subset in combinations(changed, size):
+                operands = list(relations)
+                for pos in subset:
+                    operands[pos] = update.get(bag.get_guards()[pos].get_label())
+
+                for tup, mult in _lookup_join(operands, subset).items():
+                    changes[tup.project(variables)] += mult
+
+        delta = {}
+        for tup, change in changes.items():
+            before = support.get_multiplicity(tup)
+            if before == 0 and change != 0:
+                delta[tup] = 1
+            elif before != 0 and before + change == 0:
+                delta[tup] = -1
+
+        support.apply(MultisetRelation("", set(variables), changes))
+        return MultisetRelation("", set(variables), delta)
+
+
+class FreeConnexJoinTree(GeneralizedJoinTree):
+    """
+    Class that represents a generalized join tree of a query with free
+    variables, together with a connex subset, i.e., a set of nodes that
+    contains the root and the parent of each of its nodes, whose variables
+    are exactly the free variables. Enumeration only iterates the tuples of
+    the connex subset; the subtrees below it contribute the multiplicities
+    of their psi, which sum over the projected-away variables.
+    """
+    def __init__(self, root=None, connex=None, free=None):
+        super().__init__(root)
+        self._connex = [] if connex is None else connex
+        self._free = set() if free is None else free
+
+    def get_connex_subset(self):
+        return self._connex
+
+    def get_free_variables(self):
+        return self._free
+
+    def enumerate(self):
+        """
+        Function to compute the results of the query, i.e., the join projected
+        on the free variables, with multiplicities summed over the others.
+
+        :return: (MultisetRelation) result of the query.
+        """
+        if not self._root:
+            return None
+
+        result = MultisetRelation("", set(self._free))
+        result.add(dict(self.iter_results()))
+        return result
+
+    def _iter_encoded(self):
+        """
+        Generator to stream the results of the query with constant delay.
+        As every tuple of the connex subset extends to results of the query
+        after the semi-join reduction, and two combinations of its tuples
+        agree on the free variables only if they are equal, every step yields
+        a distinct result. Its multiplicity multiplies the multiplicities of
+        the leaves in the connex subset and the psi of the children outside it.
+        """
+        if not self._root:
+            return
+
+        members = {id(node) for node in self._connex}
+        nodes = [node for node in self._root.preorder() if id(node) in members]
+        position = {id(node): pos for pos, node in enumerate(nodes)}
+        parents = [position[id(node._parent)] if node._parent is not None else None for node in nodes]
+        pvars = [frozenset(node.get_pvar()) for node in nodes]
+        leaves = [len(node.get_children()) == 0 for node in nodes]
+        factors = [[(child, frozenset(child.get_pvar())) for child in node.get_children() if id(child) not in members]
+                   for node in nodes]
+
+        current = [None] * len(nodes)
+        partial = [None] * (len(nodes) + 1)
+        partial[0] = (RelTuple.empty(), 1)
+        cursors = [self._open(nodes[0], RelTuple.empty())] + [None] * (len(nodes) - 1)
+
+        i = 0
+        while i >= 0:
+            entry = self._step(nodes[i], cursors[i])
+            if entry is None:
+                i -= 1
+                continue
+
+            tup, mult = entry
+            current[i] = tup
+            factor = mult if leaves[i] else 1
+            for child, child_pvar in factors[i]:
+                factor *= child._psi.get_multiplicity(tup.project(child_pvar))
+
+            acc, acc_mult = partial[i]
+            partial[i + 1] = (acc.join(tup), acc_mult * factor)
+
+            if i + 1 == len(nodes):
+                yield partial[i + 1]
+            else:
+                i += 1
+                key = current[parents[i]].project(pvars[i])
+                cursors[i] = self._open(nodes[i], key)
+
+
+def _lookup_join(relations: list, seeds: tuple):
+    """
+    Function to join relations by index lookups, starting from the seeds
+    and continuing with the relation sharing the most variables with the
+    partial results, such that the work is proportional to the partial
+    results rather than to the sizes of the relations.
+
+    :param relations: (list) MultisetRelations to join.
+    :param seeds: (tuple) positions of the small relations to start from.
+    :return: (dict) mapping the results of the join onto their multiplicities.
+    """
+    partial = {RelTuple.empty(): 1}
+    variables = set()
+    remaining = list(range(len(relations)))
+    while remaining and partial:
+        pos = max(remaining, key=lambda i: (i in seeds, len(variables.intersection(relations[i].get_variables()))))
+        remaining.remove(pos)
+        shared = frozenset(variables.intersection(relations[pos].get_variables()))
+        result = Counter()
+        for tup, mult in partial.items():
+            for r_tup, r_mult in relations[pos].lookup(tup.project(shared)):
+                result[tup.join(r_tup)] += mult * r_mult
+
+        partial = {tup: mult for tup, mult in result.items() if mult != 0}
+        variables.update(relations[pos].get_variables())
+
+    return partial
 
 
 def _to_generalized_join_tree(node: TreeNode, join_tree: JoinTree, parent):
@@ -0,0 +1,92 @@
+import bz2
+import csv
+import gzip
+import lzma
+from itertools import islice
+
+CHUNK_SIZE = 1 << 16
+BUFFER_SIZE = 1 << 20
+
+_COMPRESSIONS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+_DELIMITERS = {".csv": ",", ".tsv": "\t"}
+
+
+def _open(file: str):
+    """
+    Function to open a, possibly compressed, text file for buffered reading.
+    The compression is derived from the extension of the file.
+
+    :param file: (String) path to the file.
+    :return: (File) opened in text mode.
+    """
+    for extension, opener in _COMPRESSIONS.items():
+        if file.endswith(extension):
+            return opener(file, "rt", newline="")
+
+    return open(file, "r", buffering=BUFFER_SIZE, newline="")
+
+
+def _delimiter(file: str):
+    """
+    Function to derive the delimiter from the extension of the file, ignoring
+    the extension of the compression. Whitespace separated files yield None.
+    """
+    for extension in _COMPRESSIONS:
+        if file.endswith(extension):
+            file = file[:-len(extension)]
+
+    for extension, delimiter in _DELIMITERS.items():
+        if file.endswith(extension):
+            return delimiter
+
+    return None
+
+
+class RelationReader:
+    """
+    Class that streams the rows of a relation file in chunks. The first row
+    represents the header of the relation, i.e., it specifies the variables
+    that the relation defines. Rows are either separated by whitespace or,
+    for CSV and TSV files, by a delimiter. Compressed files are supported.
+    """
+    def __init__(self, file: str, delimiter=None, chunk_size=CHUNK_SIZE):
+        if delimiter is None:
+            delimiter = _delimiter(file)
+
+        self._file = file
+        self._delimiter = delimiter
+        self._chunk_size = chunk_size
+        self._handle = None
+        self._rows = None
+        self._header = None
+
+    def __enter__(self):
+        self._handle = _open(self._file)
+        if self._delimiter is None:
+            self._rows = (line.split() for line in self._handle)
+        else:
+            self._rows = csv.reader(self._handle, delimiter=self._delimiter)
+
+        self._rows = (row for row in self._rows if row)
+        self._header = [var.strip() for var in next(self._rows, [])]
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._handle.close()
+        return False
+
+    def get_header(self):
+        return self._header
+
+    def chunks(self):
+        """
+        Generator to iterate the rows following the header.
+
+        :return: (Generator) iterating lists of at most chunk_size rows, every row being a list of strings.
+        """
+        while True:
+            chunk = list(islice(self._rows, self._chunk_size))
+            if not chunk:
+                return
+
+            yield chunk
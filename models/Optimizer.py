@@ -0,0 +1,219 @@
+from models.HyperEdge import BagEdge
+from models.HyperGraph import HyperGraph
+from models.JoinTree import GeneralizedJoinTree, GeneralizedTreeNode, JoinTree
+from models.Relation import RelationalCatalog
+from models.Statistics import CatalogStatistics
+
+
+class ExactStatistics:
+    """
+    Class that answers the cardinality estimates of the optimizer exactly,
+    by projecting the relations of the catalog. Answers are cached, as the
+    same projections are estimated for many plans.
+    """
+    def __init__(self, catalog: RelationalCatalog):
+        self._catalog = catalog
+        self._distinct = {}
+
+    def cardinality(self, name: str):
+        """
+        Function to obtain the number of distinct tuples of a relation.
+
+        :param name: (String) name of the relation.
+        :return: (Number) number of distinct tuples.
+        """
+        return self.distinct(name, self._catalog.get(name).get_variables())
+
+    def distinct(self, name: str, variables: set):
+        """
+        Function to obtain the number of distinct values of a relation on the given variables.
+
+        :param name: (String) name of the relation.
+        :param variables: (set) variables to count the distinct values of.
+        :return: (Number) number of distinct values.
+        """
+        key = (name, frozenset(variables))
+        if key not in self._distinct:
+            self._distinct[key] = self._catalog.get(name).project(set(variables)).size()
+
+        return self._distinct[key]
+
+
+class Optimizer:
+    """
+    Class that chooses the generalized join tree to evaluate a query with,
+    i.e., the join tree, its root and the guards of its nodes. Alternative
+    join trees and all of their re-rootings are generated and the cost of
+    every plan is estimated as the total size of the relations it assigns
+    to its nodes, from statistics on the base relations: those the catalog
+    keeps, if any, and exact ones otherwise. The bags of cyclic queries are
+    materialized into a scratch catalog to be costed, and only those of the
+    chosen plan are added to the catalog.
+    """
+    def __init__(self, catalog: RelationalCatalog, statistics=None, max_trees=8):
+        if statistics is None:
+            statistics = CatalogStatistics(catalog) if catalog.has_statistics() else ExactStatistics(catalog)
+
+        self._catalog = catalog
+        self._statistics = statistics
+        self._max_trees = max_trees
+
+    def get_statistics(self):
+        return self._statistics
+
+    def join_trees(self, hypergraph: HyperGraph, max_width=1):
+        """
+        Function to list the candidate join trees of the query. Acyclic
+        queries yield several join trees, cyclic queries the hypertree
+        decomposition of the least width, whose bags are yet to be materialized.
+
+        :param hypergraph: (HyperGraph) query to evaluate.
+        :param max_width: (int) maximal width of the decomposition of cyclic queries.
+        :return: (list) candidate JoinTrees.
+        """
+        trees = list(hypergraph.join_trees(self._max_trees))
+        if trees:
+            return trees
+
+        join_tree = hypergraph.join_tree(max_width)
+        if not join_tree.get_root():
+            return []
+
+        return [join_tree]
+
+    def plans(self, hypergraph: HyperGraph, max_width=1):
+        """
+        Generator to enumerate the candidate plans of the query, i.e., the
+        generalized variants of every candidate join tree rooted at each of
+        its nodes, with cost-based guards. The catalog is left untouched,
+        hence the bags of cyclic plans still have to be materialized, see
+        optimize and JoinTree.materialize.
+
+        :param hypergraph: (HyperGraph) query to evaluate.
+        :param max_width: (int) maximal width of the decomposition of cyclic queries.
+        :return: (Generator) iterating (cost, GeneralizedJoinTree) pairs.
+        """
+        for cost, plan, _ in self._plans(hypergraph, max_width):
+            yield cost, plan
+
+    def _plans(self, hypergraph: HyperGraph, max_width: int):
+        """
+        Generator to enumerate the candidate plans of the query, along with
+        the catalog holding their bags, if any.
+
+        :return: (Generator) iterating (cost, GeneralizedJoinTree, RelationalCatalog) triples.
+        """
+        for join_tree in self.join_trees(hypergraph, max_width):
+            catalog, statistics = self._catalog, self._statistics
+            if any(isinstance(node.get_label(), BagEdge) for node in join_tree.get_root().preorder()):
+                catalog = self._scratch(join_tree)
+                statistics = CatalogStatistics(catalog) if catalog.has_statistics() else ExactStatistics(catalog)
+
+            for node in join_tree.get_root().preorder():
+                plan = join_tree.reroot(node).generalize()
+                self._choose_guards(plan.get_root(), statistics)
+                yield self.cost(plan, statistics), plan, catalog
+
+    def _scratch(self, join_tree: JoinTree):
+        """
+        Function to materialize the bags of a hypertree decomposition into a
+        catalog of their own, sharing the relations of the atoms and the bags
+        that the catalog holds already.
+
+        :return: (RelationalCatalog) holding the relations of the decomposition.
+        """
+        scratch = RelationalCatalog(statistics=self._catalog.has_statistics())
+        for node in join_tree.get_root().preorder():
+            label = node.get_label()
+            if isinstance(label, BagEdge) and not self._catalog.contains(label.get_label()):
+                names = [guard.get_label() for guard in label.get_guards()]
+            else:
+                names = [label.get_label()] if label.is_atom() else []
+
+            for name in names:
+                if not scratch.contains(name):
+                    relation, statistics = self._catalog.get(name), self._catalog.get_statistics(name)
+                    scratch.add(relation, encoded=True, statistics=statistics)
+
+        join_tree.materialize(scratch)
+        return scratch
+
+    def optimize(self, hypergraph: HyperGraph, max_width=1):
+        """
+        Function to pick the cheapest plan of the query, to be initialized
+        afterwards. The bags of a cyclic plan are added to the catalog.
+
+        :param hypergraph: (HyperGraph) query to evaluate.
+        :param max_width: (int) maximal width of the decomposition of cyclic queries.
+        :return: (GeneralizedJoinTree) cheapest plan, None if the query cannot be decomposed.
+        """
+        best = None
+        for cost, plan, catalog in self._plans(hypergraph, max_width):
+            if best is None or cost < best[0]:
+                best = (cost, plan, catalog)
+
+        if best is None:
+            return None
+
+        _, plan, catalog = best
+        for node in plan.get_root().preorder():
+            name = node.get_label().get_label()
+            if isinstance(node.get_label(), BagEdge) and not self._catalog.contains(name):
+                self._catalog.add(catalog.get(name), encoded=True, statistics=catalog.get_statistics(name))
+
+        return plan
+
+    def cost(self, join_tree: GeneralizedJoinTree, statistics=None):
+        """
+        Function to estimate the cost of a plan as the total size of the
+        relations assigned to its nodes, i.e., lambda and its projection psi.
+        Both are projections of the atom found by following the guards down.
+
+        :param join_tree: (GeneralizedJoinTree) plan to estimate the cost of.
+        :param statistics: (object) optional statistics to estimate with, those of the optimizer by default.
+        :return: (Number) estimated cost.
+        """
+        if statistics is None:
+            statistics = self._statistics
+
+        cost = 0
+        for node in join_tree.get_root().preorder():
+            atom = self._atom(node)
+            if len(node.get_children()) > 0:
+                cost += statistics.distinct(atom, node.get_label().get_variables())
+            else:
+                cost += statistics.cardinality(atom)
+
+            cost += statistics.distinct(atom, node.get_pvar())
+
+        return cost
+
+    def _choose_guards(self, node: GeneralizedTreeNode, statistics):
+        """
+        Function to assign every interior node the guard whose atom has the
+        fewest distinct values on the variables of the node. Any child that
+        covers the variables of the node qualifies.
+        """
+        for child in node.get_children():
+            self._choose_guards(child, statistics)
+
+        if len(node.get_children()) == 0:
+            return
+
+        variables = node.get_label().get_variables()
+        candidates = [child for child in node.get_children() if child.get_label().get_variables() >= variables]
+        guard = min(candidates, key=lambda child: (statistics.distinct(self._atom(child), variables),
+                                                   child is not node.get_guard()))
+        node.set_guard(guard)
+
+    @staticmethod
+    def _atom(node: GeneralizedTreeNode):
+        """
+        Function to find the atom whose relation a node projects, by following the guards down.
+
+        :return: (String) name of the relation of the atom.
+        """
+        while len(node.get_children()) > 0:
+            node = node.get_guard()
+
+        return node.get_label().get_label()
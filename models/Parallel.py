@@ -0,0 +1,238 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from models.JoinTree import GeneralizedJoinTree, GeneralizedTreeNode
+from models.Relation import MultisetRelation, RelationalCatalog
+
+
+def _reduce_subtree(payload: bytes):
+    """
+    Function executed by the workers to initialize and reduce a detached subtree.
+
+    :param payload: (bytes) pickled subtree and the catalog of its base relations.
+    :return: (GeneralizedTreeNode) the initialized and reduced subtree.
+    """
+    subtree, catalog = pickle.loads(payload)
+    subtree.initialize(catalog)
+    subtree.semi_join_reduction()
+    return subtree
+
+
+class ParallelExecutor:
+    """
+    Class that initializes and reduces a generalized join tree on a pool of
+    processes. Sibling subtrees do not depend on each other, so the tree is
+    cut along a frontier of subtrees, which are shipped to the workers along
+    with the base relations they refer to. The nodes above the frontier are
+    handled by the calling process once the workers are done, performing the
+    exact same operations as the sequential path.
+    """
+    def __init__(self, max_workers=None):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+
+        self._max_workers = max_workers
+
+    def run(self, join_tree: GeneralizedJoinTree, catalog: RelationalCatalog):
+        """
+        Function to initialize the generalized join tree and to perform its
+        bottom-up semi-join reduction, i.e., the parallel equivalent of
+        calling initialize and semi_join_reduction on the tree. Base relations
+        in the catalog are replaced by the indexed copies of the workers.
+
+        :param join_tree: (GeneralizedJoinTree) tree to evaluate.
+        :param catalog: (RelationalCatalog) wherein base tables are stored.
+        """
+        join_tree.set_catalog(catalog)
+        root = join_tree.get_root()
+        if not root:
+            return
+
+        upper, frontier = self._cut(root)
+        shipped = [node for node in frontier if len(node.get_children()) > 0]
+        if shipped:
+            with ProcessPoolExecutor(self._max_workers) as pool:
+                futures = [pool.submit(_reduce_subtree, self._detach(node, catalog)) for node in shipped]
+                for node, future in zip(shipped, futures):
+                    self._attach(node, future.result(), catalog)
+
+        for node in frontier:
+            if len(node.get_children()) == 0:
+                node.initialize(catalog)
+                node.semi_join_reduction()
+
+        # Parents were appended before their children
+        for node in reversed(upper):
+            node.initialize_node(catalog)
+            node.reduce_node()
+
+    def _cut(self, root: GeneralizedTreeNode):
+        """
+        Function to cut the tree into the nodes handled locally and a
+        frontier of subtrees, by repeatedly splitting the largest subtree
+        of the frontier until there is one for every worker.
+
+        :return: (tuple) nodes above the frontier, parents first, and the frontier.
+        """
+        upper = [root]
+        frontier = list(root.get_children())
+        while len(frontier) < self._max_workers:
+            interior = [node for node in frontier if len(node.get_children()) > 0]
+            if not interior:
+                break
+
+            largest = max(interior, key=lambda node: len(node.preorder()))
+            frontier.remove(largest)
+            upper.append(largest)
+            frontier.extend(largest.get_children())
+
+        return upper, frontier
+
+    @staticmethod
+    def _detach(node: GeneralizedTreeNode, catalog: RelationalCatalog):
+        """
+        Function to serialize a subtree without its ancestors. The parent is
+        replaced by a bare node carrying its label, which is all the subtree
+        needs to determine its pvar.
+
+        :return: (bytes) pickled subtree and the catalog of its base relations.
+        """
+        relations = RelationalCatalog()
+        for descendant in node.preorder():
+            if len(descendant.get_children()) == 0:
+                relations.add(catalog.get(descendant.get_label().get_label()))
+
+        parent = node.get_parent()
+        node.set_parent(GeneralizedTreeNode(parent.get_label()))
+        try:
+            return pickle.dumps((node, relations), protocol=pickle.HIGHEST_PROTOCOL)
+        finally:
+            node.set_parent(parent)
+
+    @staticmethod
+    def _attach(original: GeneralizedTreeNode, reduced: GeneralizedTreeNode, catalog: RelationalCatalog):
+        """
+        Function to substitute a subtree by its reduced counterpart.
+        """
+        parent = original.get_parent()
+        children = parent.get_children()
+        children[children.index(original)] = reduced
+        if parent.get_guard() is original:
+            parent.set_guard(reduced)
+        reduced.set_parent(parent)
+
+        for descendant in reduced.preorder():
+            if len(descendant.get_children()) == 0:
+                name = descendant.get_label().get_label()
+                catalog.add(descendant.get_relation(), encoded=True, statistics=catalog.get_statistics(name))
+
+
+def _evaluate_partition(payload: bytes):
+    """
+    Function executed by the workers to evaluate a join tree on one partition of the data.
+
+    :param payload: (bytes) pickled join tree and the catalog of the partition.
+    :return: (MultisetRelation) join result of the partition.
+    """
+    join_tree, catalog = pickle.loads(payload)
+    join_tree.initialize(catalog)
+    join_tree.semi_join_reduction()
+
+    result = MultisetRelation("", _output_variables(join_tree))
+    result.add(dict(join_tree.iter_results()))
+    return result
+
+
+def _output_variables(join_tree: GeneralizedJoinTree):
+    variables = set()
+    for node in join_tree.get_root().preorder():
+        variables.update(node.get_label().get_variables())
+
+    return variables
+
+
+class PartitionedExecutor:
+    """
+    Class that evaluates a generalized join tree in a data-parallel fashion.
+    The base relations containing the partitioning variable are
+    hash-partitioned on it, whereas the other relations are replicated to
+    every partition. Hence, every join result is produced by exactly one
+    partition, and the partitions are evaluated independently by a pool of
+    processes before their results are merged.
+    """
+    def __init__(self, partitions=None, max_workers=None):
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if partitions is None:
+            partitions = max_workers
+
+        self._partitions = partitions
+        self._max_workers = max_workers
+
+    @staticmethod
+    def partition_variable(join_tree: GeneralizedJoinTree):
+        """
+        Function to choose the partitioning variable among the join variables
+        of the root, i.e., the one shared by the most atoms, such that the
+        fewest relations have to be replicated.
+
+        :param join_tree: (GeneralizedJoinTree) tree to evaluate.
+        :return: (String) partitioning variable.
+        """
+        root = join_tree.get_root()
+        atoms = [node.get_label() for node in root.preorder() if len(node.get_children()) == 0]
+        return max(sorted(root.get_label().get_variables()),
+                   key=lambda var: sum(var in atom.get_variables() for atom in atoms))
+
+    def partition(self, join_tree: GeneralizedJoinTree, catalog: RelationalCatalog, variable=None):
+        """
+        Function to split the base relations of the tree into co-partitioned catalogs.
+
+        :param join_tree: (GeneralizedJoinTree) tree to evaluate.
+        :param catalog: (RelationalCatalog) wherein base tables are stored.
+        :param variable: (String) optional partitioning variable.
+        :return: (list) RelationalCatalogs, one per partition.
+        """
+        if variable is None:
+            variable = self.partition_variable(join_tree)
+
+        catalogs = [RelationalCatalog() for _ in range(self._partitions)]
+        for node in join_tree.get_root().preorder():
+            if len(node.get_children()) > 0 or catalogs[0].contains(node.get_label().get_label()):
+                continue
+
+            relation = catalog.get(node.get_label().get_label())
+            if variable in relation.get_variables():
+                parts = relation.partition(variable, self._partitions)
+            else:
+                parts = [relation] * self._partitions
+
+            for part, partition_catalog in zip(parts, catalogs):
+                partition_catalog.add(part)
+
+        return catalogs
+
+    def enumerate(self, join_tree: GeneralizedJoinTree, catalog: RelationalCatalog):
+        """
+        Function to compute the join result by initializing, reducing and
+        enumerating every partition in a worker process and merging the
+        results. The tree itself is shipped to the workers and should not
+        have been initialized. Encoded results are decoded once merged.
+
+        :param join_tree: (GeneralizedJoinTree) tree to evaluate.
+        :param catalog: (RelationalCatalog) wherein base tables are stored.
+        :return: (MultisetRelation) result of the join.
+        """
+        if not join_tree.get_root():
+            return None
+
+        payloads = [pickle.dumps((join_tree, partition_catalog), protocol=pickle.HIGHEST_PROTOCOL)
+                    for partition_catalog in self.partition(join_tree, catalog)]
+
+        result = MultisetRelation("", _output_variables(join_tree))
+        with ProcessPoolExecutor(self._max_workers) as pool:
+            for partial in pool.map(_evaluate_partition, payloads):
+                result.add(dict(partial.generator()))
+
+        return catalog.decode(result)
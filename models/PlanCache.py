@@ -0,0 +1,320 @@
+from collections import OrderedDict
+
+from models.HyperEdge import BagEdge, HyperEdge
+from models.HyperGraph import HyperGraph
+from models.JoinTree import GeneralizedJoinTree, GeneralizedTreeNode
+
+
+def _refine(colors: list, adjacency: list, changed=None):
+    """
+    Function to refine a colouring of the incidence graph until vertices of
+    the same colour have the same number of neighbours of every colour. The
+    vertices of a colour are split by the colours of their neighbours, after
+    which only the neighbours of the vertices that changed colour are
+    revisited. The largest part of a split keeps its colour, the others
+    obtain a colour derived from their signature, such that the refinement
+    does not depend on the order of the vertices, only on the colouring.
+
+    :param colors: (list) colour of every vertex.
+    :param adjacency: (list) neighbours of every vertex.
+    :param changed: (Iterable) vertices that changed colour since the colouring was refined, if it was.
+    :return: (list) refined colour of every vertex.
+    """
+    colors = list(colors)
+
+    def signature(v):
+        return hash(tuple(sorted([colors[u] for u in adjacency[v]])))
+
+    cells = {}
+    for v, color in enumerate(colors):
+        cells.setdefault(color, set()).add(v)
+
+    touched = set(range(len(colors))) if changed is None else {u for v in changed for u in adjacency[v]}
+    while touched:
+        splits = {}
+        for v in touched:
+            splits.setdefault(colors[v], {}).setdefault(signature(v), set()).add(v)
+
+        # Vertices that were not touched keep the signature that their colour shares
+        for color, parts in splits.items():
+            rest = cells[color] - touched
+            if rest:
+                parts.setdefault(signature(next(iter(rest))), set()).update(rest)
+
+        recolored = set()
+        for color, parts in splits.items():
+            if len(parts) == 1:
+                continue
+
+            size = len(cells[color])
+            kept = max(parts, key=lambda sig: (len(parts[sig]), -sig))
+            for sig, part in parts.items():
+                if sig != kept:
+                    new_color = hash((color, sig, size))
+                    cells[color] -= part
+                    cells[new_color] = part
+                    for v in part:
+                        colors[v] = new_color
+                    recolored.update(part)
+
+        touched = {u for v in recolored for u in adjacency[v]}
+
+    return colors
+
+
+def _individualize(colors: list, vertex: int):
+    """
+    Function to distinguish a vertex from the other vertices of its colour.
+    """
+    individualized = list(colors)
+    individualized[vertex] = hash((colors[vertex], -1, colors.count(colors[vertex])))
+    return individualized
+
+
+def _split(colors: list, cell: list):
+    """
+    Function to distinguish every vertex of a cell from the others, in the order of the cell.
+    """
+    split = list(colors)
+    for rank, v in enumerate(cell):
+        split[v] = hash((colors[v], -1, len(cell), rank))
+
+    return split
+
+
+def _incidence(hypergraph: HyperGraph):
+    """
+    Function to build the incidence graph of a hypergraph, wherein the
+    variables are vertices 0..n-1 and the hyperedges vertices n..n+m-1.
+
+    :return: (tuple) variables, hyperedges and the neighbours of every vertex.
+    """
+    edges = list(hypergraph.get_edges())
+    variables = list(set(hypergraph.get_vertices()).union(*[edge.get_variables() for edge in edges]))
+    position = {var: pos for pos, var in enumerate(variables)}
+
+    adjacency = [[] for _ in range(len(variables) + len(edges))]
+    for pos, edge in enumerate(edges):
+        for var in edge.get_variables():
+            adjacency[position[var]].append(len(variables) + pos)
+            adjacency[len(variables) + pos].append(position[var])
+
+    return variables, edges, adjacency
+
+
+def _invariant(colors: list, variables: int):
+    """
+    Function to summarize a refined colouring of the incidence graph, which
+    does not depend on the names of the variables and hyperedges, as the
+    colours are derived from the structure of the graph only. Hypergraphs of
+    the same shape share it, whereas hypergraphs of different shapes rarely do.
+
+    :return: (tuple) number of variables and the sorted colours of the vertices.
+    """
+    return variables, tuple(sorted(colors))
+
+
+def _isomorphism(colors: list, adjacency: list, other_colors: list, other_adjacency: list, memo=None):
+    """
+    Function to find an isomorphism between two incidence graphs, given
+    their refined colourings. Vertices of the first graph are individualized
+    together with a candidate of the same colour in the second one, until
+    both colourings are discrete. At first, every vertex of the ambiguous
+    colour is matched with the vertex of the same rank at once, which for
+    symmetric queries such as stars immediately yields an isomorphism. If
+    that guess fails, candidates are tried one vertex at a time, until the
+    first isomorphism is found.
+
+    :param memo: (dict) optional colourings of the first graph refined before, by the steps leading to them.
+    :return: (list) image of every vertex of the first graph, None if the graphs are not isomorphic.
+    """
+    if memo is None:
+        memo = {}
+    memo[()] = colors
+
+    def search(path, other_colors, guess):
+        colors = memo[path]
+        if sorted(colors) != sorted(other_colors):
+            return None
+
+        cells = {}
+        for v, color in enumerate(colors):
+            cells.setdefault(color, []).append(v)
+
+        target = next((cells[color] for color in sorted(cells) if len(cells[color]) > 1), None)
+        if target is None:
+            images = {color: v for v, color in enumerate(other_colors)}
+            mapping = [images[color] for color in colors]
+            if all(sorted([mapping[u] for u in adjacency[v]]) == sorted(other_adjacency[mapping[v]])
+                   for v in range(len(colors))):
+                return mapping
+            return None
+
+        candidates = [v for v, color in enumerate(other_colors) if color == colors[target[0]]]
+        # Steps are None for splitting the ambiguous colour, the individualized vertex otherwise
+        step = path + (None if guess else target[0],)
+        if step not in memo:
+            memo[step] = _refine(_split(colors, target) if guess else _individualize(colors, target[0]), adjacency,
+                                 target if guess else target[:1])
+
+        if guess:
+            return search(step, _refine(_split(other_colors, candidates), other_adjacency, candidates), guess)
+
+        for candidate in candidates:
+            mapping = search(step, _refine(_individualize(other_colors, candidate), other_adjacency, [candidate]),
+                             guess)
+            if mapping is not None:
+                return mapping
+
+        return None
+
+    if len(colors) != len(other_colors):
+        return None
+
+    mapping = search((), other_colors, True)
+    return mapping if mapping is not None else search((), other_colors, False)
+
+
+class PlanCache:
+    """
+    Class that memoizes the generalized join trees of cyclic queries by
+    their shape, such that queries that only differ in the names of their
+    variables and relations are decomposed once. Templates are looked up by
+    an invariant of the refined incidence graph of the hypergraph and
+    compared by an isomorphism test to the templates sharing it. As a hit
+    refines the incidence graph, it costs about as much as the GYO
+    reduction, hence acyclic queries are planned directly rather than
+    cached; the hits pay off for cyclic queries, whose decomposition is
+    searched by the marshals and robbers game.
+    Plans are stored as templates over the positions of the variables and
+    hyperedges of the query first planned, and instantiated with those of
+    every query of the same shape. The cache can be bounded in size,
+    evicting the templates of the least recently used invariant first.
+    """
+    def __init__(self, max_size=128):
+        self._max_size = max_size
+        self._templates = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def plan(self, hypergraph: HyperGraph, max_width=1):
+        """
+        Function to obtain the generalized join tree of a query. Acyclic
+        queries are planned by the GYO reduction, cyclic queries only if no
+        query of the same shape was planned before. Bags of cyclic queries
+        still have to be materialized, see JoinTree.materialize.
+
+        :param hypergraph: (HyperGraph) query to plan.
+        :param max_width: (int) maximal width of the decomposition of cyclic queries.
+        :return: (GeneralizedJoinTree) fresh, uninitialized plan of the query, None if it cannot be decomposed.
+        """
+        join_tree = hypergraph.join_tree_gyo()
+        if join_tree is not None:
+            return join_tree.generalize()
+
+        variables, edges, adjacency = _incidence(hypergraph)
+        colors = _refine([0] * len(variables) + [1] * len(edges), adjacency)
+        key = (_invariant(colors, len(variables)), max_width)
+
+        entries = self._templates.setdefault(key, [])
+        self._templates.move_to_end(key)
+        for pos, (rep_colors, rep_adjacency, template, memo) in enumerate(entries):
+            mapping = _isomorphism(rep_colors, rep_adjacency, colors, adjacency, memo)
+            if mapping is not None:
+                self._hits += 1
+                entries.append(entries.pop(pos))
+                if template is None:
+                    return None
+
+                # Align the names of the query with the positions of the template
+                variables = [variables[v] for v in mapping[:len(variables)]]
+                edges = [edges[v - len(variables)] for v in mapping[len(variables):]]
+                return GeneralizedJoinTree(self._instantiate(template, variables, edges, None))
+
+        self._misses += 1
+        template = self._template(hypergraph, max_width, variables, edges)
+        entries.append((colors, adjacency, template, {}))
+        self._size += 1
+        if self._max_size is not None and self._size > self._max_size:
+            evicted = next(iter(self._templates))
+            self._templates[evicted].pop(0)
+            if not self._templates[evicted]:
+                del self._templates[evicted]
+            self._size -= 1
+            self._evictions += 1
+
+        if template is None:
+            return None
+
+        return GeneralizedJoinTree(self._instantiate(template, variables, edges, None))
+
+    @staticmethod
+    def _template(hypergraph: HyperGraph, max_width: int, variables: list, edges: list):
+        """
+        Function to plan a query and to abstract the plan from its names.
+
+        :return: (tuple) template of the root, None if the query cannot be decomposed.
+        """
+        join_tree = hypergraph.join_tree(max_width)
+        if not join_tree.get_root():
+            return None
+
+        var_pos = {var: pos for pos, var in enumerate(variables)}
+        edge_pos = {id(edge): pos for pos, edge in enumerate(edges)}
+
+        def abstract(node):
+            label = node.get_label()
+            var_set = frozenset(var_pos[var] for var in label.get_variables())
+            if isinstance(label, BagEdge):
+                abstract_label = ("bag", tuple(edge_pos[id(guard)] for guard in label.get_guards()), var_set)
+            elif label.is_atom():
+                abstract_label = ("atom", edge_pos[id(label)])
+            else:
+                abstract_label = ("variables", var_set)
+
+            children = node.get_children()
+            guard = children.index(node.get_guard()) if node.get_guard() is not None else None
+            return abstract_label, guard, tuple(abstract(child) for child in children)
+
+        return abstract(join_tree.generalize().get_root())
+
+    @staticmethod
+    def _instantiate(template: tuple, variables: list, edges: list, parent):
+        """
+        Function to build the plan of a query from a template.
+
+        :return: (GeneralizedTreeNode) root of the plan.
+        """
+        (kind, *payload), guard, children = template
+        if kind == "bag":
+            label = BagEdge([edges[pos] for pos in payload[0]], {variables[pos] for pos in payload[1]})
+        elif kind == "atom":
+            label = edges[payload[0]]
+        else:
+            label = HyperEdge("", {variables[pos] for pos in payload[0]}, False)
+
+        node = GeneralizedTreeNode(label, parent=parent)
+        for child in children:
+            node.add_child(PlanCache._instantiate(child, variables, edges, node))
+        if guard is not None:
+            node.set_guard(node.get_children()[guard])
+
+        return node
+
+    def get_hits(self):
+        return self._hits
+
+    def get_misses(self):
+        return self._misses
+
+    def get_evictions(self):
+        return self._evictions
+
+    def size(self):
+        return self._size
+
+    def clear(self):
+        self._templates.clear()
+        self._size = 0
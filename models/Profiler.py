@@ -0,0 +1,171 @@
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+
+
+class Profiler:
+    """
+    Class that records, per node of a generalized join tree and per phase,
+    i.e., initialize, semi_join_reduction, filter, index, update, enumerate
+    and stream, the number of calls, their wall time, the tuples that went in
+    and out and, optionally, the peak of the memory allocated. Times and
+    memory are exclusive: a phase nested in another one, e.g., the recursive
+    enumeration of a child, is charged to the inner phase only.
+
+    Every measurement is passed on to the listeners as an event, i.e., a
+    dict with the label of the node, the phase and the measured values.
+    """
+    def __init__(self, memory=False):
+        self._memory = memory
+        self._metrics = defaultdict(dict)
+        self._labels = {}
+        self._listeners = []
+        self._stack = []
+        self._tracing = False
+
+    def add_listener(self, listener):
+        """
+        Function to register a callback for the measurements, e.g., to forward them to a monitoring system.
+
+        :param listener: (Function) called with every event.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+
+    def measure(self, node, phase: str, work, tuples_in=None, tuples_out=None):
+        """
+        Function to perform and measure the work of a node in a phase.
+
+        :param node: (GeneralizedTreeNode) node performing the work.
+        :param phase: (String) name of the phase.
+        :param work: (Function) without arguments, performing the work.
+        :param tuples_in: (int) optional number of tuples the work consumes.
+        :param tuples_out: (Function) optional, mapping the outcome of the work onto the number of tuples produced.
+        :return: (object) outcome of the work.
+        """
+        frame = {"children": 0.0, "peak": 0, "memory": 0}
+        if self._memory:
+            if not self._stack and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing = True
+
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            frame["memory"] = current
+
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            outcome = work()
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+
+        peak_bytes = None
+        if self._memory:
+            peak = max(tracemalloc.get_traced_memory()[1], frame["peak"])
+            peak_bytes = peak - frame["memory"]
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            elif self._tracing:
+                tracemalloc.stop()
+                self._tracing = False
+
+        if self._stack:
+            self._stack[-1]["children"] += elapsed
+
+        self._record(node, phase, {"seconds": elapsed - frame["children"], "tuples_in": tuples_in,
+                                   "tuples_out": tuples_out(outcome) if tuples_out is not None else None,
+                                   "peak_bytes": peak_bytes})
+        return outcome
+
+    def _record(self, node, phase: str, measured: dict):
+        """
+        Function to accumulate a measurement into the metrics of the node and notify the listeners.
+        """
+        self._labels[id(node)] = str(node.get_label())
+        metrics = self._metrics[id(node)].setdefault(phase, {"calls": 0, "seconds": 0.0, "tuples_in": 0,
+                                                             "tuples_out": 0, "peak_bytes": None})
+        metrics["calls"] += 1
+        metrics["seconds"] += measured["seconds"]
+        for key in ("tuples_in", "tuples_out"):
+            if measured[key] is not None:
+                metrics[key] += measured[key]
+        if measured["peak_bytes"] is not None:
+            metrics["peak_bytes"] = max(metrics["peak_bytes"] or 0, measured["peak_bytes"])
+
+        event = dict(measured, node=self._labels[id(node)], phase=phase)
+        for listener in self._listeners:
+            listener(event)
+
+    def get_metrics(self, node):
+        """
+        Function to fetch the metrics of a node.
+
+        :param node: (GeneralizedTreeNode) node of the profiled tree.
+        :return: (dict) mapping phases onto calls, seconds, tuples in and out, and peak bytes.
+        """
+        return self._metrics.get(id(node), {})
+
+    def records(self):
+        """
+        Function to flatten the metrics, e.g., to export them.
+
+        :return: (list) dicts with the label of the node, the phase and its metrics.
+        """
+        return [dict(metrics, node=self._labels[key], phase=phase)
+                for key, phases in self._metrics.items() for phase, metrics in phases.items()]
+
+    def reset(self):
+        self._metrics = defaultdict(dict)
+        self._labels = {}
+
+    def __getstate__(self):
+        # Listeners and measurements in progress cover the process of the profiler only
+        return {"_memory": self._memory, "_metrics": defaultdict(dict), "_labels": {}, "_listeners": [],
+                "_stack": [], "_tracing": False}
+
+    def explain(self, root):
+        """
+        Function to render the metrics on top of the structure of a tree,
+        one line per node, indented by depth, listing the phases it took part in.
+
+        :param root: (GeneralizedTreeNode) root of the profiled tree.
+        :return: (String) rendering of the tree.
+        """
+        lines = []
+
+        def render(node, depth: int):
+            phases = []
+            for phase, metrics in self.get_metrics(node).items():
+                measured = "{} calls={} time={:.3f}ms in={} out={}".format(
+                    phase, metrics["calls"], metrics["seconds"] * 1000, metrics["tuples_in"], metrics["tuples_out"])
+                if metrics["peak_bytes"] is not None:
+                    measured += " peak={:.1f}KiB".format(metrics["peak_bytes"] / 1024)
+                phases.append(measured)
+
+            guard = " [guard]" if node.get_parent() is not None and node.get_parent().get_guard() is node else ""
+            lines.append("{}{}{}".format("  " * depth, node.get_label(), guard))
+            for measured in phases:
+                lines.append("{}  | {}".format("  " * depth, measured))
+            for child in node.get_children():
+                render(child, depth + 1)
+
+        render(root, 0)
+        return "\n".join(lines)
+
+
+class JSONLinesExporter:
+    """
+    Class that listens to a Profiler and writes every event as a line of JSON, e.g., to a file or a socket.
+    """
+    def __init__(self, stream):
+        self._stream = stream
+
+    def __call__(self, event: dict):
+        self._stream.write(json.dumps(event) + "\n")
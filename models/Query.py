@@ -0,0 +1,119 @@
+from collections import Counter
+
+from models.HyperEdge import HyperEdge
+from models.HyperGraph import HyperGraph
+from models.JoinTree import FreeConnexJoinTree, GeneralizedTreeNode
+
+
+class Query:
+    """
+    Class that represents a conjunctive query, i.e., the join of the atoms
+    of a hypergraph projected on its free variables. Multiplicities are
+    summed over the variables that are projected away.
+    """
+    def __init__(self, hypergraph: HyperGraph, free=None):
+        self._hypergraph = hypergraph
+        self._free = set(hypergraph.get_vertices()) if free is None else set(free)
+
+    def get_hypergraph(self):
+        return self._hypergraph
+
+    def get_free_variables(self):
+        return self._free
+
+    def is_full(self):
+        return self._free == set(self._variables())
+
+    def is_acyclic(self):
+        return self._hypergraph.is_acyclic()
+
+    def is_free_connex(self):
+        """
+        Function to determine whether the query is free-connex acyclic, i.e.,
+        whether the hypergraph is acyclic, also once extended by a hyperedge
+        over the free variables.
+
+        :return: (boolean) True if free-connex acyclic, False otherwise
+        """
+        if not self.is_acyclic():
+            return False
+
+        edges = set(self._hypergraph.get_edges())
+        edges.add(HyperEdge("", set(self._free), False))
+        return HyperGraph(set(self._variables()), edges).is_acyclic()
+
+    def _variables(self):
+        return set(self._hypergraph.get_vertices()).union(*[edge.get_variables()
+                                                            for edge in self._hypergraph.get_edges()])
+
+    def join_tree(self):
+        """
+        Function to construct a generalized join tree of the query with a
+        connex subset covering exactly the free variables, by means of a
+        GYO-style reduction that builds the tree bottom-up. Every hyperedge
+        is represented by a tree, atoms by a leaf. A variable that occurs in
+        a single hyperedge is removed by a new node over the remaining
+        variables, guarded by the tree of the hyperedge. A hyperedge that is
+        contained in another one is removed by joining its tree with the tree
+        of the other one under a new node, guarded by the latter. Bound
+        variables are removed first; the roots at that point and the nodes
+        created afterwards form the connex subset.
+
+        :return: (FreeConnexJoinTree) uninitialized tree, None if the query is not free-connex acyclic.
+        """
+        edges = sorted(self._hypergraph.get_edges(), key=lambda edge: edge.get_label())
+        if len(edges) == 0:
+            return None
+
+        forest = [(frozenset(edge.get_variables()), GeneralizedTreeNode(edge)) for edge in edges]
+        forest = self._reduce(forest, self._free)
+        if any(not variables.issubset(self._free) for variables, _ in forest):
+            return None
+
+        connex = [node for _, node in forest]
+        created = []
+        forest = self._reduce(forest, None, created)
+        if len(forest) > 1:
+            return None
+
+        connex.extend(created)
+        return FreeConnexJoinTree(forest[0][1], connex, set(self._free))
+
+    @staticmethod
+    def _reduce(forest: list, free, created=None):
+        """
+        Function to apply the reduction steps until none applies.
+
+        :param forest: (list) pairs of the remaining variables of every hyperedge and the root of its tree.
+        :param free: (set) variables that may not be removed, None to remove any variable.
+        :param created: (list) optional list to collect the nodes created.
+        :return: (list) reduced forest.
+        """
+        def add(label: set, children: list, guard):
+            node = GeneralizedTreeNode(HyperEdge("", set(label), False), guard=guard)
+            for child in children:
+                child.set_parent(node)
+                node.add_child(child)
+            if created is not None:
+                created.append(node)
+            return node
+
+        reduced = True
+        while reduced:
+            reduced = False
+            occurrences = Counter(var for variables, _ in forest for var in variables)
+            for pos, (variables, node) in enumerate(forest):
+                isolated = {var for var in variables if occurrences[var] == 1 and (free is None or var not in free)}
+                if isolated:
+                    forest[pos] = (variables - isolated, add(variables - isolated, [node], node))
+                    reduced = True
+
+            for (contained, sub), (pos, (variables, node)) in ((entry, other) for entry in forest
+                                                               for other in enumerate(forest)):
+                if sub is not node and contained.issubset(variables):
+                    forest[pos] = (variables, add(variables, [node, sub], node))
+                    forest.remove((contained, sub))
+                    reduced = True
+                    break
+
+        return forest
@@ -1,21 +1,151 @@
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from frozendict import frozendict
 
+from models.Dictionary import Dictionary
+from models.IndexManager import IndexBudget, IndexManager
+from models.Loader import CHUNK_SIZE, RelationReader
+from models.Statistics import RelationStatistics
+
 
 # Sources:
 #  - https://docs.python.org/3.1/library/collections.html#collections.Counter
 #  - https://docs.python.org/3/library/collections.html#collections.namedtuple
+def _gather(positions: list):
+    """
+    Function to compile a list of positions into a function that gathers
+    the values at these positions from a tuple.
+
+    :param positions: (list) positions to gather.
+    :return: (Function) mapping a tuple onto the tuple of gathered values.
+    """
+    if len(positions) == 0:
+        return lambda values: ()
+
+    if len(positions) == 1:
+        pos = positions[0]
+        return lambda values: (values[pos],)
+
+    return itemgetter(*positions)
+
+
+class Schema:
+    """
+    Class that represents the schema of relational tuples, i.e., a mapping
+    from variables to positions. Schemas are shared: every set of variables
+    maps onto a single Schema, which also caches the compiled projection
+    and join plans starting from it.
+    """
+    _schemas = {}
+
+    def __init__(self, variables: tuple):
+        self._variables = variables
+        self._positions = {var: pos for pos, var in enumerate(variables)}
+        self._projections = {}
+        self._joins = {}
+
+    @staticmethod
+    def get(variables):
+        """
+        Function to retrieve the shared schema for the given set of variables.
+
+        :param variables: (iterable) variables of the schema.
+        :return: (Schema) schema over the given variables.
+        """
+        key = frozenset(variables)
+        schema = Schema._schemas.get(key)
+        if schema is None:
+            schema = Schema(tuple(sorted(key)))
+            Schema._schemas[key] = schema
+
+        return schema
+
+    def get_variables(self):
+        return self._variables
+
+    def position(self, variable):
+        return self._positions[variable]
+
+    def projection(self, variables: frozenset):
+        """
+        Function to retrieve the compiled plan to project tuples of this
+        schema on the given set of variables.
+
+        :param variables: (frozenset) variables to project on.
+        :return: (tuple) schema of the projection and function gathering its values.
+        """
+        plan = self._projections.get(variables)
+        if plan is None:
+            target = Schema.get(variables)
+            plan = (target, _gather([self._positions[var] for var in target.get_variables()]))
+            self._projections[variables] = plan
+
+        return plan
+
+    def join(self, right):
+        """
+        Function to retrieve the compiled plan to join tuples of this schema
+        with tuples of the given schema. Values of shared variables are taken
+        from the right tuple.
+
+        :param right: (Schema) schema of the right tuples.
+        :return: (tuple) schema of the join and function gathering its values from the concatenated values.
+        """
+        plan = self._joins.get(right)
+        if plan is None:
+            target = Schema.get(self._variables + right.get_variables())
+            offset = len(self._variables)
+            positions = [offset + right.position(var) if var in right._positions else self._positions[var]
+                         for var in target.get_variables()]
+            plan = (target, _gather(positions))
+            self._joins[right] = plan
+
+        return plan
+
+    def __reduce__(self):
+        # Keep schemas shared when tuples are unpickled
+        return Schema.get, (self._variables,)
+
+
 class RelTuple:
     """
-    Class that represents a relational tuple.
+    Class that represents a relational tuple, i.e., a tuple of values
+    positioned according to a shared Schema.
     """
+    __slots__ = ("_schema", "_values")
+
     def __init__(self, attr_map=None):
         if attr_map is None:
             attr_map = {}
-        self._attr_map = frozendict(attr_map)
+        self._schema = Schema.get(attr_map)
+        self._values = tuple(attr_map[var] for var in self._schema.get_variables())
+
+    @staticmethod
+    def from_values(schema: Schema, values: tuple):
+        """
+        Function to create a tuple directly from positional values.
+
+        :param schema: (Schema) schema of the tuple.
+        :param values: (tuple) values ordered according to the schema.
+        :return: (RelTuple) tuple with the given values.
+        """
+        tup = RelTuple.__new__(RelTuple)
+        tup._schema = schema
+        tup._values = values
+        return tup
 
     def get_attributes(self):
-        return self._attr_map
+        return frozendict(zip(self._schema.get_variables(), self._values))
+
+    def get_schema(self):
+        return self._schema
+
+    def get_values(self):
+        return self._values
+
+    def get(self, variable):
+        return self._values[self._schema.position(variable)]
 
     def project(self, variables: set):
         """
@@ -24,11 +154,8 @@ class RelTuple:
         :param variables: (set) variables to project on.
         :return: (RelationTuple) obtained by projecting on given set of variables.
         """
-        proj = {}
-        for var in variables:
-            proj[var] = self._attr_map[var]
-
-        return RelTuple(frozendict(proj))
+        schema, gather = self._schema.projection(frozenset(variables))
+        return RelTuple.from_values(schema, gather(self._values))
 
     def join(self, tuple):
         """
@@ -37,26 +164,25 @@ class RelTuple:
         :param tuple: (RelTuple) to join with
         :return:  (RelTuple) obtained by joining with tuple
         """
-        tup = RelTuple()
-        tup._attr_map = frozendict({**self._attr_map, **tuple.get_attributes()})
-        return tup
+        schema, gather = self._schema.join(tuple._schema)
+        return RelTuple.from_values(schema, gather(self._values + tuple._values))
 
     @staticmethod
     def empty():
-        return RelTuple(frozendict({}))
+        return RelTuple.from_values(Schema.get(()), ())
 
     def __str__(self):
-        return str(list(self._attr_map.items()))
+        return str(list(zip(self._schema.get_variables(), self._values)))
 
     def __eq__(self, other):
         if not isinstance(other, RelTuple):
             # don't attempt to compare against unrelated types
             return NotImplemented
 
-        return self._attr_map == other._attr_map
+        return self._schema is other._schema and self._values == other._values
 
     def __hash__(self):
-        return hash(self._attr_map)
+        return hash(self._values)
 
 
 class MultisetRelation:
@@ -70,7 +196,7 @@ class MultisetRelation:
         self._name = name
         self._variables = variables
         self._cnt = Counter()
-        self._index = None
+        self._indexes = IndexManager()
         self.add(tuples)
 
     def get_variables(self):
@@ -79,8 +205,66 @@ class MultisetRelation:
     def get_name(self):
         return self._name
 
+    def set_name(self, name):
+        self._name = name
+
+    def size(self):
+        return len(self._cnt)
+
     def add(self, tuples: list):
+        """
+        Function to add tuples to the multiset, given either as a list of
+        RelTuples or as a mapping from RelTuples to multiplicities.
+
+        :param tuples: (list) RelTuples to add.
+        """
         self._cnt.update(tuples)
+        self._indexes.clear()
+
+    def remove(self, tuples: list):
+        """
+        Function to lower the multiplicity of the given tuples by one, e.g., to
+        express deletions in an update. Multiplicities may become negative.
+
+        :param tuples: (list) RelTuples to remove.
+        """
+        self._cnt.subtract(tuples)
+        self._indexes.clear()
+
+    def apply(self, delta):
+        """
+        Function to apply a delta relation with signed multiplicities in place.
+        Tuples whose multiplicity drops to zero are removed, and the indexes
+        are maintained for the affected tuples only.
+
+        :param delta: (MultisetRelation) delta to apply.
+        """
+        changes = []
+        for tup, mult in delta.generator():
+            if mult == 0:
+                continue
+
+            new_mult = self._cnt[tup] + mult
+            if new_mult == 0:
+                del self._cnt[tup]
+            else:
+                self._cnt[tup] = new_mult
+            changes.append((tup, new_mult))
+
+        indexes = list(self._indexes.items())
+        for schema, index in indexes:
+            variables = frozenset(schema.get_variables())
+            for tup, new_mult in changes:
+                key = tup.project(variables)
+                if new_mult == 0:
+                    del index[key][tup]
+                    if not index[key]:
+                        del index[key]
+                else:
+                    index[key][tup] = new_mult
+
+        for schema, _ in indexes:
+            self._indexes.resize(schema, len(self._cnt))
 
     def copy(self):
         rel = MultisetRelation(self._name, self._variables)
@@ -89,10 +273,64 @@ class MultisetRelation:
 
         return rel
 
-    def print(self):
-        for tup, mult in self._cnt.items():
+    def distinct(self):
+        """
+        Function to obtain the set of tuples in the multiset, i.e., a copy
+        wherein every tuple has multiplicity one.
+
+        :return: (MultisetRelation) with the distinct tuples.
+        """
+        rel = MultisetRelation(self._name, self._variables)
+        for tup in self._cnt:
+            rel._cnt[tup] = 1
+
+        return rel
+
+    def print(self, dictionaries=None):
+        """
+        Function to print the tuples in the MultisetRelation.
+
+        :param dictionaries: (Function) optional mapping from variables onto Dictionaries to decode the values.
+        """
+        rel = self.decode(dictionaries) if dictionaries else self
+        for tup, mult in rel._cnt.items():
             print(str(tup), mult)
 
+    def encode(self, dictionaries):
+        """
+        Function to replace the values of the tuples by their dictionary codes.
+
+        :param dictionaries: (Function) mapping variables onto their Dictionaries.
+        :return: (MultisetRelation) with encoded values.
+        """
+        return self._recode(lambda var: dictionaries(var).encode)
+
+    def decode(self, dictionaries):
+        """
+        Function to replace the dictionary codes of the tuples by their values.
+
+        :param dictionaries: (Function) mapping variables onto their Dictionaries.
+        :return: (MultisetRelation) with decoded values.
+        """
+        return self._recode(lambda var: dictionaries(var).decode)
+
+    def _recode(self, translator):
+        """
+        Function to map the values of every tuple by the per-variable
+        function that the translator returns.
+        """
+        rel = MultisetRelation(self._name, self._variables)
+        functions = {}
+        for tup, mult in self._cnt.items():
+            schema = tup.get_schema()
+            if schema not in functions:
+                functions[schema] = [translator(var) for var in schema.get_variables()]
+
+            values = tuple([function(value) for function, value in zip(functions[schema], tup.get_values())])
+            rel._cnt[RelTuple.from_values(schema, values)] += mult
+
+        return rel
+
     def generator(self):
         """
         Generator to iterate the tuples in the MultisetRelation.
@@ -105,14 +343,16 @@ class MultisetRelation:
     def project(self, variables: set):
         """
         Function to project the tuples in the multiset onto the
-        given set of variables.
+        given set of variables. Multiplicities of tuples that coincide
+        after projection are summed.
 
         :param variables: (set) variables to project on.
         :return: (MultisetRelation) obtained by projecting tuples on given set of variables.
         """
         rel = MultisetRelation("", variables)
+        variables = frozenset(variables)
         for tup, mult in self._cnt.items():
-            rel._cnt[tup.project(variables)] = mult
+            rel._cnt[tup.project(variables)] += mult
 
         return rel
 
@@ -146,6 +386,27 @@ class MultisetRelation:
 
         return rel
 
+    def join(self, right):
+        """
+        Function to compute the natural join of the current GMR with the given
+        GMR, by means of a hash join on the shared variables.
+
+        :param right: (MultisetRelation) to join with.
+        :return: (MultisetRelation) obtained by joining
+        """
+        rel = MultisetRelation("", set(self._variables).union(right.get_variables()))
+        join_vars = frozenset(self._variables.intersection(right.get_variables()))
+
+        table = defaultdict(list)
+        for r_tup, r_mult in right.generator():
+            table[r_tup.project(join_vars)].append((r_tup, r_mult))
+
+        for l_tup, l_mult in self._cnt.items():
+            for r_tup, r_mult in table.get(l_tup.project(join_vars), ()):
+                rel._cnt[l_tup.join(r_tup)] += l_mult * r_mult
+
+        return rel
+
     def semi_join(self, right):
         """
         Function to perform a left semi-join with the given relation.
@@ -154,15 +415,57 @@ class MultisetRelation:
         :return: (MultisetRelation) obtained by performing left-semi join with right.
         """
         rel = MultisetRelation("", self._variables)
-        join_vars = self._variables.intersection(right.get_variables())
-        projected = right.project(join_vars)
+        join_vars = frozenset(self._variables.intersection(right.get_variables()))
+        totals = {}
         for tup, mult in self._cnt.items():
-            right_mult = projected.get_multiplicity(tup.project(join_vars))
+            key = tup.project(join_vars)
+            right_mult = totals.get(key)
+            if right_mult is None:
+                right_mult = totals[key] = right.total(key)
+
             if right_mult > 0:
                 rel._cnt[tup] += mult * right_mult
 
         return rel
 
+    def filter(self, right):
+        """
+        Function to perform a left semi-join with the given relation that
+        only filters, i.e., the multiplicities of the surviving tuples are
+        preserved.
+
+        :param right: (MultisetRelation) to semi-join with.
+        :return: (MultisetRelation) with the tuples that have a match in right.
+        """
+        rel = MultisetRelation("", self._variables)
+        join_vars = frozenset(self._variables.intersection(right.get_variables()))
+        matches = {}
+        for tup, mult in self._cnt.items():
+            key = tup.project(join_vars)
+            match = matches.get(key)
+            if match is None:
+                match = matches[key] = right.total(key) != 0
+
+            if match:
+                rel._cnt[tup] = mult
+
+        return rel
+
+    def partition(self, variable, partitions: int):
+        """
+        Function to hash-partition the MultisetRelation on the given variable.
+        Equal values end up in the same partition across relations.
+
+        :param variable: (String) variable to partition on.
+        :param partitions: (int) number of partitions.
+        :return: (list) MultisetRelations, one per partition.
+        """
+        parts = [MultisetRelation(self._name, self._variables) for _ in range(partitions)]
+        for tup, mult in self._cnt.items():
+            parts[hash(tup.get(variable)) % partitions]._cnt[tup] = mult
+
+        return parts
+
     def get_multiplicity(self, rel_tuple: RelTuple):
         """
         Function to retrieve the multiplicity of the given RelationalTuple
@@ -173,65 +476,312 @@ class MultisetRelation:
         """
         return self._cnt[rel_tuple]
 
+    def total(self, rel_tuple: RelTuple):
+        """
+        Function to sum the multiplicities of the tuples that match the
+        given rel_tuple, making use of the index on its variables.
+
+        :param rel_tuple: (RelTuple) to match tuples against.
+        :return: (Number) total multiplicity of the matching tuples.
+        """
+        if len(rel_tuple.get_schema().get_variables()) == len(self._variables):
+            return self._cnt[rel_tuple]
+
+        return sum(self._index(rel_tuple.get_schema()).get(rel_tuple, {}).values())
+
+    def get_indexes(self):
+        return self._indexes
+
     def create_index(self, variables: set):
         """
-        Function to create an index of the MultisetRelation on the given set of variables.
+        Function to create an index of the MultisetRelation on the given set
+        of variables, unless it exists already. Indexes are otherwise built
+        on their first use.
 
         :param variables: (set) variables to create the index on
         """
-        self._index = defaultdict(list)
+        self._index(Schema.get(variables))
+
+    def _index(self, schema: Schema):
+        return self._indexes.get(schema, self._build_index)
+
+    def _build_index(self, schema: Schema):
+        """
+        Function to build an index mapping the keys over the variables of the
+        schema onto the matching tuples and their multiplicities.
+
+        :return: (tuple) index and its size.
+        """
+        index = defaultdict(dict)
+        variables = frozenset(schema.get_variables())
         for tup, mult in self._cnt.items():
-            self._index[tup.project(variables)].append([tup, mult])
+            index[tup.project(variables)][tup] = mult
+
+        return index, len(self._cnt)
 
     def retrieve(self, rel_tuple: RelTuple):
         """
         Function to retrieve tuples that match the given rel_tuple, making
-        use of the index.
+        use of the index on its variables.
 
         :param rel_tuple: (RelTuple) to match tuples against
         :return: (MultisetRelation) of matching tuples
         """
         rel = MultisetRelation("", self._variables)
-        for tup, mult in self._index[rel_tuple]:
+        for tup, mult in self._index(rel_tuple.get_schema()).get(rel_tuple, {}).items():
             rel._cnt[tup] = mult
 
         return rel
 
+    def lookup(self, rel_tuple: RelTuple):
+        """
+        Function to iterate the tuples that match the given rel_tuple, making
+        use of the index on its variables, without copying them into a new
+        MultisetRelation.
+
+        :param rel_tuple: (RelTuple) to match tuples against
+        :return: (Iterable) of (RelTuple, multiplicity) pairs
+        """
+        return self._index(rel_tuple.get_schema()).get(rel_tuple, {}).items()
+
     @staticmethod
-    def from_file(name, file):
+    def from_file(name, file, types=None, delimiter=None, chunk_size=CHUNK_SIZE):
         """
         Function to read a MultisetRelation from a file. Function assumes
         that the first line represents the header of the relation, i.e., it
-        should specify the variables that the relation defines.
+        should specify the variables that the relation defines. The file is
+        streamed in chunks, duplicate rows are counted along the way.
 
         :param name: (String) name of the MultisetRelation.
-        :param file: (String) path to the file representing the MultisetRelation.
+        :param file: (String) path to the, possibly compressed, file representing the MultisetRelation.
+        :param types: (dict) optional mapping from variables to types, e.g., int, values remain strings otherwise.
+        :param delimiter: (String) optional delimiter, derived from the extension of the file when absent.
+        :param chunk_size: (int) number of rows parsed at once.
         :return: (MultisetRelation) as read from the file.
         """
-        tuples = []
-        f = open(file, "r")
-        header = None
-        for line in f:
-            if header is None:
-                header = line.replace("\n", "").split(" ")
+        counts = Counter()
+        with RelationReader(file, delimiter, chunk_size) as reader:
+            header = reader.get_header()
+            schema = Schema.get(header)
+            gather = _gather([header.index(var) for var in schema.get_variables()])
+            convert = None
+            if types:
+                converters = [types.get(var, str) for var in schema.get_variables()]
+                convert = lambda values: tuple([conv(val) for conv, val in zip(converters, values)])
+
+            for chunk in reader.chunks():
+                rows = map(gather, chunk)
+                counts.update(map(convert, rows) if convert else rows)
+
+        rel = MultisetRelation(name, set(header))
+        rel.add({RelTuple.from_values(schema, values): mult for values, mult in counts.items()})
+        return rel
 
-            else:
-                val = line.replace("\n", "").split(" ")
-                tuples.append(RelTuple(dict(zip(header, val))))
 
-        return MultisetRelation(name, set(header), tuples)
+def _load(loader, name: str, file: str, statistics: bool, kwargs: dict):
+    """
+    Function to load a relation in a worker process, along with its statistics if requested.
+
+    :return: (tuple) relation and its RelationStatistics, None if not requested.
+    """
+    relation = loader(name, file, **kwargs)
+    return relation, RelationStatistics.from_relation(relation) if statistics else None
 
 
 class RelationalCatalog:
     """
     Class that represents a database of MultisetRelations, i.e., a mapping
-    from names to MultisetRelations.
+    from names to MultisetRelations. The indexes of its relations can be
+    bounded by a budget, i.e., a maximum number of indexed tuples. The
+    catalog optionally keeps RelationStatistics on its relations, which
+    describe the relations as stored, i.e., in terms of codes when encoding.
     """
-    def __init__(self):
+    def __init__(self, encoding=False, domains=None, index_budget=None, statistics=False):
         self._catalog = {}
+        self._budget = IndexBudget(index_budget) if index_budget is not None else None
+        self._encoding = encoding
+        self._domains = {} if domains is None else domains
+        self._dictionaries = {}
+        self._loaders = {}
+        self._statistics = {} if statistics else None
+
+    def add(self, relation: MultisetRelation, encoded=False, statistics=None):
+        """
+        Function to add a relation to the catalog. When the catalog encodes
+        its relations, the values are replaced by their dictionary codes.
+
+        :param relation: (MultisetRelation) relation to add.
+        :param encoded: (bool) whether the relation holds codes already, e.g., as it was derived from the catalog.
+        :param statistics: (RelationStatistics) statistics collected beforehand, collected from the relation otherwise.
+        """
+        if self._encoding and not encoded:
+            relation = relation.encode(self.get_dictionary)
+
+        if self._statistics is not None:
+            if statistics is None:
+                statistics = RelationStatistics.from_relation(relation)
+            self._statistics[relation.get_name()] = statistics
+
+        if self._budget is not None:
+            replaced = self._catalog.get(relation.get_name())
+            if replaced is not None and replaced is not relation:
+                replaced.get_indexes().set_budget(None)
+            relation.get_indexes().set_budget(self._budget)
 
-    def add(self, relation: MultisetRelation):
         self._catalog[relation.get_name()] = relation
 
     def get(self, name: str):
-        return self._catalog[name]
\ No newline at end of file
+        if name not in self._catalog and name in self._loaders:
+            loader, encoded = self._loaders.pop(name)
+            relation = loader()
+            relation.set_name(name)
+            self.add(relation, encoded)
+
+        return self._catalog[name]
+
+    def contains(self, name: str):
+        return name in self._catalog or name in self._loaders
+
+    def register(self, name: str, loader, encoded=False):
+        """
+        Function to register a relation that is loaded on its first access only.
+
+        :param name: (String) name of the relation.
+        :param loader: (Function) without arguments, returning the relation.
+        :param encoded: (bool) whether the relation holds codes of the catalog already.
+        """
+        self._loaders[name] = (loader, encoded)
+
+    def load(self, files: dict, loader=None, max_workers=None, **kwargs):
+        """
+        Function to load several relations into the catalog in parallel, one
+        file per worker process.
+
+        :param files: (dict) mapping from names of relations to paths of files.
+        :param loader: (Function) reading a relation given its name and file, MultisetRelation.from_file by default.
+        :param max_workers: (int) number of processes, the number of CPUs by default.
+        :param kwargs: additional arguments passed on to the loader.
+        """
+        if loader is None:
+            loader = MultisetRelation.from_file
+
+        # Statistics on values rather than codes can be collected by the workers
+        collect = self._statistics is not None and not self._encoding
+        with ProcessPoolExecutor(max_workers) as pool:
+            futures = [pool.submit(_load, loader, name, file, collect, kwargs) for name, file in files.items()]
+            for future in futures:
+                relation, statistics = future.result()
+                self.add(relation, statistics=statistics)
+
+    def is_encoding(self):
+        return self._encoding
+
+    def has_statistics(self):
+        return self._statistics is not None
+
+    def get_statistics(self, name: str):
+        """
+        Function to fetch the statistics of a relation.
+
+        :param name: (String) name of the relation.
+        :return: (RelationStatistics) of the relation, None if the catalog keeps no statistics.
+        """
+        if self._statistics is None:
+            return None
+
+        if name not in self._statistics:
+            self.get(name)
+
+        return self._statistics[name]
+
+    def record(self, name: str, delta: MultisetRelation):
+        """
+        Function to account for a delta that has been applied to a relation
+        of the catalog, e.g., by a GeneralizedJoinTree, in its statistics.
+
+        :param name: (String) name of the relation.
+        :param delta: (MultisetRelation) delta with signed multiplicities, encoded if the catalog encodes.
+        """
+        if self._statistics is not None and name in self._statistics:
+            self._statistics[name].record(self._catalog[name], delta)
+
+    def get_index_budget(self):
+        return self._budget
+
+    def get_dictionary(self, variable):
+        """
+        Function to fetch the Dictionary of the domain of a variable. Variables
+        form their own domain unless mapped onto a shared one at construction.
+
+        :param variable: (String) variable of which to fetch the Dictionary.
+        :return: (Dictionary) of the domain of the variable.
+        """
+        domain = self._domains.get(variable, variable)
+        if domain not in self._dictionaries:
+            self._dictionaries[domain] = Dictionary()
+
+        return self._dictionaries[domain]
+
+    def get_domains(self):
+        return self._domains
+
+    def get_dictionaries(self):
+        return self._dictionaries
+
+    def set_dictionary(self, domain, dictionary: Dictionary):
+        """
+        Function to install the Dictionary of a domain, e.g., as persisted
+        along with relations encoded by it. Codes that have been assigned
+        already must remain valid, hence of two Dictionaries of which one
+        extends the other, the longer one is kept.
+
+        :param domain: (String) domain of the Dictionary.
+        :param dictionary: (Dictionary) to install.
+        """
+        current = self._dictionaries.get(domain)
+        if current is not None:
+            shorter, longer = sorted((current, dictionary), key=Dictionary.size)
+            if shorter.get_values() != longer.get_values()[:shorter.size()]:
+                raise ValueError("Dictionary of domain {} conflicts with the one of the catalog".format(domain))
+            dictionary = longer
+
+        self._dictionaries[domain] = dictionary
+
+    def encode(self, relation):
+        """
+        Function to encode a relation with the dictionaries of the catalog,
+        e.g., to express an update of one of its relations.
+
+        :param relation: (MultisetRelation) relation to encode.
+        :return: (MultisetRelation) encoded relation, the relation itself if the catalog does not encode.
+        """
+        if not self._encoding:
+            return relation
+
+        return relation.encode(self.get_dictionary)
+
+    def decode(self, relation):
+        """
+        Function to decode a relation holding codes of the catalog.
+
+        :param relation: (MultisetRelation) relation to decode.
+        :return: (MultisetRelation) decoded relation, the relation itself if the catalog does not encode.
+        """
+        if not self._encoding:
+            return relation
+
+        return relation.decode(self.get_dictionary)
+
+    def decode_tuple(self, rel_tuple: RelTuple):
+        """
+        Function to decode a tuple holding codes of the catalog.
+
+        :param rel_tuple: (RelTuple) tuple to decode.
+        :return: (RelTuple) decoded tuple.
+        """
+        if not self._encoding:
+            return rel_tuple
+
+        schema = rel_tuple.get_schema()
+        return RelTuple.from_values(schema, tuple([self.get_dictionary(var).decode(value) for var, value
+                                                   in zip(schema.get_variables(), rel_tuple.get_values())]))
@@ -0,0 +1,212 @@
+import heapq
+import math
+from hashlib import blake2b
+
+
+def stable_hash(value):
+    """
+    Function to hash a value to 64 bits, independently of the process,
+    unlike the built-in hash of strings.
+
+    :param value: (object) value to hash.
+    :return: (int) hash of the value.
+    """
+    return int.from_bytes(blake2b(repr(value).encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+    """
+    Class that estimates the number of distinct values of a stream in a
+    fixed amount of memory, by keeping, per register, the longest run of
+    leading zeros among the hashes of the values assigned to it. Values can
+    only be added: the estimate does not decrease under deletions.
+    """
+    def __init__(self, precision=12):
+        self._precision = precision
+        self._registers = bytearray(1 << precision)
+
+    def add(self, value):
+        h = stable_hash(value)
+        register = h & ((1 << self._precision) - 1)
+        rank = 64 - self._precision - (h >> self._precision).bit_length() + 1
+        if rank > self._registers[register]:
+            self._registers[register] = rank
+
+    def merge(self, other):
+        """
+        Function to merge the sketch of another stream into this one.
+
+        :param other: (HyperLogLog) sketch of the same precision.
+        """
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+    def count(self):
+        """
+        Function to estimate the number of distinct values added.
+
+        :return: (int) estimated number of distinct values.
+        """
+        m = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -rank for rank in self._registers)
+        zeros = self._registers.count(0)
+        if estimate <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / zeros)
+
+        return int(round(estimate))
+
+
+class HeavyHitters:
+    """
+    Class that keeps the most frequent values of a stream, weighted by
+    multiplicity, by means of the Space-Saving algorithm: once all counters
+    are taken, a new value replaces the least frequent one and inherits its
+    count. Counts are thus overestimated by at most the smallest count kept.
+    """
+    def __init__(self, capacity=16):
+        self._capacity = capacity
+        self._counts = {}
+
+    @staticmethod
+    def from_counts(counts, capacity=16):
+        """
+        Function to summarize exact counts, keeping the most frequent values.
+
+        :param counts: (Iterable) of (value, count) pairs, each value occurring once.
+        :param capacity: (int) number of values to keep.
+        :return: (HeavyHitters) summary of the counts.
+        """
+        summary = HeavyHitters(capacity)
+        summary._counts = dict(heapq.nlargest(capacity, counts, key=lambda entry: entry[1]))
+        return summary
+
+    def add(self, value, weight=1):
+        """
+        Function to account for occurrences of a value. Negative weights,
+        i.e., deletions, only lower the counts of values kept.
+
+        :param value: (object) value that occurred.
+        :param weight: (int) number of occurrences.
+        """
+        if value in self._counts:
+            self._counts[value] += weight
+            if self._counts[value] <= 0:
+                del self._counts[value]
+
+        elif weight > 0:
+            if len(self._counts) >= self._capacity:
+                evicted = min(self._counts, key=self._counts.get)
+                weight += self._counts.pop(evicted)
+
+            self._counts[value] = weight
+
+    def top(self, n=None):
+        """
+        Function to list the most frequent values.
+
+        :param n: (int) number of values to list, all values kept by default.
+        :return: (list) (value, estimated count) pairs, most frequent first.
+        """
+        entries = sorted(self._counts.items(), key=lambda entry: entry[1], reverse=True)
+        return entries if n is None else entries[:n]
+
+
+class RelationStatistics:
+    """
+    Class that describes the contents of a relation: its number of distinct
+    tuples, its total multiplicity and, for every variable, a sketch of its
+    distinct values and a summary of its most frequent values.
+    """
+    def __init__(self, variables: set, precision=12, capacity=16):
+        self._rows = 0
+        self._total = 0
+        self._distinct = {var: HyperLogLog(precision) for var in variables}
+        self._heavy_hitters = {var: HeavyHitters(capacity) for var in variables}
+
+    @staticmethod
+    def from_relation(relation, precision=12, capacity=16):
+        """
+        Function to collect the statistics of a relation, by means of one
+        projection per variable, which sums the multiplicities per value.
+
+        :param relation: (MultisetRelation) relation to describe, either row-based or columnar.
+        :param precision: (int) precision of the distinct value sketches.
+        :param capacity: (int) number of heavy hitters kept per variable.
+        :return: (RelationStatistics) of the relation.
+        """
+        variables = relation.get_variables()
+        statistics = RelationStatistics(variables, precision, capacity)
+        statistics._rows = relation.size()
+        statistics._total = sum(mult for _, mult in relation.project(set()).generator())
+        for var in variables:
+            counts = [(tup.get_values()[0], mult) for tup, mult in relation.project({var}).generator()]
+            for value, _ in counts:
+                statistics._distinct[var].add(value)
+            statistics._heavy_hitters[var] = HeavyHitters.from_counts(counts, capacity)
+
+        return statistics
+
+    def record(self, relation, delta):
+        """
+        Function to account for a delta that has been applied to the relation.
+
+        :param relation: (MultisetRelation) relation after applying the delta.
+        :param delta: (MultisetRelation) delta with signed multiplicities.
+        """
+        for tup, mult in delta.generator():
+            if mult == 0:
+                continue
+
+            new_mult = relation.get_multiplicity(tup)
+            self._rows += (new_mult != 0) - (new_mult - mult != 0)
+            self._total += mult
+            for var, value in zip(tup.get_schema().get_variables(), tup.get_values()):
+                if var in self._distinct:
+                    if mult > 0:
+                        self._distinct[var].add(value)
+                    self._heavy_hitters[var].add(value, mult)
+
+    def get_rows(self):
+        return self._rows
+
+    def get_total(self):
+        return self._total
+
+    def get_distinct(self, variable):
+        return self._distinct[variable].count()
+
+    def get_heavy_hitters(self, variable, n=None):
+        return self._heavy_hitters[variable].top(n)
+
+    def distinct(self, variables: set):
+        """
+        Function to estimate the number of distinct values on a set of
+        variables, assuming that the variables are independent.
+
+        :param variables: (set) variables to count the distinct values of.
+        :return: (int) estimated number of distinct values.
+        """
+        if len(variables) == 0:
+            return 1 if self._rows > 0 else 0
+
+        estimate = 1
+        for var in variables:
+            estimate *= max(self.get_distinct(var), 1)
+
+        return min(estimate, self._rows)
+
+
+class CatalogStatistics:
+    """
+    Class that answers the cardinality estimates of the optimizer from the
+    statistics that a RelationalCatalog maintains on its relations.
+    """
+    def __init__(self, catalog):
+        self._catalog = catalog
+
+    def cardinality(self, name: str):
+        return self._catalog.get_statistics(name).get_rows()
+
+    def distinct(self, name: str, variables: set):
+        return self._catalog.get_statistics(name).distinct(variables)
@@ -0,0 +1,207 @@
+import json
+import os
+import struct
+from functools import partial
+
+import numpy as np
+
+from models.ColumnarRelation import ColumnarMultisetRelation
+from models.Dictionary import Dictionary
+from models.Relation import RelationalCatalog
+
+MAGIC = b"DYNREL01"
+ALIGNMENT = 64
+EXTENSION = ".rel"
+DICTIONARIES = "dictionaries.json"
+
+# Magic followed by the length of the metadata
+_PREAMBLE = struct.Struct("<8sQ")
+
+
+def _align(offset: int):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _columns(relation):
+    """
+    Function to obtain the typed columns and multiplicities of a relation.
+    Columns of a MultisetRelation keep the types of their values.
+
+    :return: (tuple) sorted variables, mapping from variables to columns and the multiplicities.
+    """
+    if not isinstance(relation, ColumnarMultisetRelation):
+        relation = ColumnarMultisetRelation.from_relation(relation)
+
+    order = sorted(relation.get_variables())
+    return order, {var: relation.get_column(var) for var in order}, relation.get_multiplicities()
+
+
+def write_relation(relation, path: str, index=None):
+    """
+    Function to write a relation in the binary column format. The file
+    starts with a magic number and the length of the JSON metadata, which
+    describes the relation and the position of every array. The typed
+    columns, the multiplicities and, optionally, the index follow, each
+    aligned such that they can be memory-mapped.
+
+    :param relation: (MultisetRelation) relation to write, either row-based or columnar.
+    :param path: (String) path of the file.
+    :param index: (set) optional variables to persist an index on, the index of a columnar relation by default.
+    """
+    order, columns, mult = _columns(relation)
+    arrays = [("column:" + var, np.ascontiguousarray(columns[var])) for var in order]
+    arrays.append(("multiplicities", np.ascontiguousarray(mult, dtype=np.int64)))
+
+    key_vars = None
+    if index is not None or isinstance(relation, ColumnarMultisetRelation):
+        indexed = ColumnarMultisetRelation(relation.get_name(), set(order), columns, mult)
+        if index is not None:
+            indexed.create_index(index)
+        elif relation.get_index() is not None:
+            indexed = relation
+
+        if indexed.get_index() is not None:
+            key_vars, perm, starts = indexed.get_index()
+            arrays.append(("index:perm", np.ascontiguousarray(perm, dtype=np.int64)))
+            arrays.append(("index:starts", np.ascontiguousarray(starts, dtype=np.int64)))
+
+    layout = {}
+    offset = 0
+    for key, array in arrays:
+        if array.dtype == object:
+            raise ValueError("Column {} has no fixed-width type".format(key))
+
+        layout[key] = {"dtype": array.dtype.str, "offset": offset, "length": len(array)}
+        offset = _align(offset + array.nbytes)
+
+    metadata = json.dumps({"name": relation.get_name(), "variables": order, "rows": len(mult),
+                           "index": key_vars, "arrays": layout}).encode("utf-8")
+    start = _align(_PREAMBLE.size + len(metadata))
+
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(MAGIC, len(metadata)))
+        f.write(metadata)
+        for key, array in arrays:
+            f.seek(start + layout[key]["offset"])
+            f.write(array.tobytes())
+
+
+def read_metadata(path: str):
+    """
+    Function to read the metadata of a relation in the binary column format.
+
+    :param path: (String) path of the file.
+    :return: (tuple) metadata and the position where the arrays start.
+    """
+    with open(path, "rb") as f:
+        magic, length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError("{} is not a relation in the binary column format".format(path))
+
+        metadata = json.loads(f.read(length).decode("utf-8"))
+
+    return metadata, _align(_PREAMBLE.size + length)
+
+
+def read_relation(path: str, name=None):
+    """
+    Function to open a relation in the binary column format. The arrays are
+    memory-mapped copy-on-write rather than read, such that pages are only
+    loaded once they are accessed.
+
+    :param path: (String) path of the file.
+    :param name: (String) optional name of the relation, the stored name by default.
+    :return: (ColumnarMultisetRelation) backed by the file.
+    """
+    metadata, start = read_metadata(path)
+
+    def array(key):
+        entry = metadata["arrays"][key]
+        if entry["length"] == 0:
+            return np.empty(0, dtype=entry["dtype"])
+
+        return np.memmap(path, dtype=entry["dtype"], mode="c", offset=start + entry["offset"],
+                         shape=(entry["length"],))
+
+    columns = {var: array("column:" + var) for var in metadata["variables"]}
+    relation = ColumnarMultisetRelation(metadata["name"] if name is None else name, set(metadata["variables"]),
+                                        columns, array("multiplicities"))
+    if metadata["index"] is not None:
+        relation.set_index(metadata["index"], array("index:perm"), array("index:starts"))
+
+    return relation
+
+
+def write_catalog(catalog: RelationalCatalog, names: list, directory: str):
+    """
+    Function to write relations of a catalog to a directory, one file per
+    relation. When the catalog encodes its relations, the files hold codes,
+    hence the dictionaries of the catalog are written along with them, as
+    JSON, such that the values can be restored.
+
+    :param catalog: (RelationalCatalog) wherein the relations are stored.
+    :param names: (list) names of the relations to write.
+    :param directory: (String) path of the directory.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name in names:
+        write_relation(catalog.get(name), os.path.join(directory, name + EXTENSION))
+
+    path = os.path.join(directory, DICTIONARIES)
+    if catalog.is_encoding():
+        dictionaries = json.dumps({"domains": catalog.get_domains(),
+                                   "dictionaries": {domain: dictionary.get_values()
+                                                    for domain, dictionary in catalog.get_dictionaries().items()}})
+        with open(path, "w") as f:
+            f.write(dictionaries)
+
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def open_catalog(directory: str, catalog=None):
+    """
+    Function to register every relation in a directory with a catalog. The
+    relations are opened once they are first fetched from the catalog.
+    Relations holding codes are registered as such with a catalog that
+    encodes, whose dictionaries are restored from the directory, and are
+    decoded for a catalog that does not.
+
+    :param directory: (String) path of the directory.
+    :param catalog: (RelationalCatalog) optional catalog to register the relations with, encoding as the relations.
+    :return: (RelationalCatalog) wherein the relations are registered.
+    """
+    path = os.path.join(directory, DICTIONARIES)
+    encoded = os.path.exists(path)
+    if encoded:
+        with open(path, "r") as f:
+            stored = json.load(f)
+
+        domains = stored["domains"]
+        dictionaries = {domain: Dictionary.from_values(values) for domain, values in stored["dictionaries"].items()}
+
+    if catalog is None:
+        catalog = RelationalCatalog(encoding=encoded, domains=domains if encoded else None)
+
+    if encoded and catalog.is_encoding():
+        if any(catalog.get_domains().get(var, var) != domains.get(var, var)
+               for var in set(domains).union(catalog.get_domains())):
+            raise ValueError("Domains of the catalog differ from those the relations in {} were encoded with"
+                             .format(directory))
+
+        for domain, dictionary in dictionaries.items():
+            catalog.set_dictionary(domain, dictionary)
+
+    for file in sorted(os.listdir(directory)):
+        if file.endswith(EXTENSION):
+            loader = partial(read_relation, os.path.join(directory, file))
+            if encoded and not catalog.is_encoding():
+                loader = partial(_decoded, loader, lambda var: dictionaries[domains.get(var, var)])
+
+            catalog.register(file[:-len(EXTENSION)], loader, encoded and catalog.is_encoding())
+
+    return catalog
+
+
+def _decoded(loader, dictionaries):
+    return loader().decode(dictionaries)
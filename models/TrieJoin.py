@@ -0,0 +1,189 @@
+from bisect import bisect_left
+
+from models.Relation import MultisetRelation, RelationalCatalog, RelTuple, Schema
+
+
+class TrieIndex:
+    """
+    Class that represents a relation as a trie over an ordering of its
+    variables. Every level keeps the values of one variable sorted, and maps
+    them onto the subtrie of tuples sharing that prefix. The last level maps
+    values onto multiplicities.
+    """
+    def __init__(self, relation, order: list):
+        self._order = order
+        root = {}
+        last = len(order) - 1
+        for tup, mult in relation.generator():
+            if mult == 0:
+                continue
+
+            node = root
+            for depth, var in enumerate(order):
+                value = tup.get(var)
+                if depth == last:
+                    node[value] = node.get(value, 0) + mult
+                else:
+                    node = node.setdefault(value, {})
+
+        self._root = TrieIndex._freeze(root, len(order))
+
+    @staticmethod
+    def _freeze(node: dict, depth: int):
+        """
+        Function to convert a level of the trie into a pair of its sorted
+        keys and the mapping from keys to subtries.
+        """
+        if depth == 1:
+            return sorted(node), node
+
+        return sorted(node), {key: TrieIndex._freeze(child, depth - 1) for key, child in node.items()}
+
+    def get_order(self):
+        return self._order
+
+    def get_root(self):
+        return self._root
+
+
+def _leapfrog(levels: list):
+    """
+    Generator to intersect sorted lists of keys by means of the leapfrog
+    strategy: the list with the smallest current key seeks the largest
+    current key, until all lists agree.
+
+    :param levels: (list) sorted lists of keys.
+    :return: (Generator) iterating the keys present in every list.
+    """
+    if len(levels) == 0 or any(len(keys) == 0 for keys in levels):
+        return
+
+    levels = sorted(levels, key=lambda keys: keys[0])
+    positions = [0] * len(levels)
+    p = 0
+    high = levels[-1][0]
+    while True:
+        keys = levels[p]
+        key = keys[positions[p]]
+        if key == high:
+            yield key
+            positions[p] += 1
+        else:
+            positions[p] = bisect_left(keys, high, positions[p])
+
+        if positions[p] == len(keys):
+            return
+
+        high = keys[positions[p]]
+        p = (p + 1) % len(levels)
+
+
+class LeapfrogTrieJoin:
+    """
+    Class that evaluates the natural join of several multiset relations by
+    means of the Leapfrog Triejoin algorithm, i.e., variable by variable,
+    intersecting the matching trie levels of all relations that contain the
+    variable. The running time is bounded by the AGM bound of the query, up
+    to a logarithmic factor. Multiplicities of joined tuples are multiplied.
+    """
+    def __init__(self, relations: list, order=None):
+        if order is None:
+            order = LeapfrogTrieJoin._default_order(relations)
+
+        self._order = order
+        self._tries = []
+        self._scale = 1
+        for relation in relations:
+            if len(relation.get_variables()) == 0:
+                # Nullary relations scale every result by their total multiplicity
+                self._scale *= sum(mult for _, mult in relation.generator())
+            else:
+                self._tries.append(TrieIndex(relation, [var for var in order if var in relation.get_variables()]))
+
+        # Relations taking part in the intersection at every depth, and whether their trie ends there
+        self._participants = [[(i, trie.get_order()[-1] == var) for i, trie in enumerate(self._tries)
+                               if var in trie.get_order()] for var in order]
+
+    @staticmethod
+    def _default_order(relations: list):
+        """
+        Function to order the variables, most shared first, such that the
+        most selective intersections are performed first.
+        """
+        occurrences = {}
+        for relation in relations:
+            for var in relation.get_variables():
+                occurrences[var] = occurrences.get(var, 0) + 1
+
+        return sorted(occurrences, key=lambda var: (-occurrences[var], var))
+
+    @staticmethod
+    def from_hypergraph(hypergraph, catalog: RelationalCatalog, order=None):
+        """
+        Function to set up the join of all atoms of a hypergraph.
+
+        :param hypergraph: (HyperGraph) query to evaluate.
+        :param catalog: (RelationalCatalog) wherein base tables are stored.
+        :param order: (list) optional ordering of the variables.
+        :return: (LeapfrogTrieJoin) evaluator of the query.
+        """
+        edges = sorted(hypergraph.get_edges(), key=lambda edge: edge.get_label())
+        return LeapfrogTrieJoin([catalog.get(edge.get_label()) for edge in edges], order)
+
+    def generator(self):
+        """
+        Generator to iterate the join results.
+
+        :return: (Generator) iterating (RelTuple, multiplicity) pairs.
+        """
+        if self._scale == 0:
+            return
+
+        schema = Schema.get(self._order)
+        gather = [schema.position(var) for var in self._order]
+        for values, mult in self._search(0, [trie.get_root() for trie in self._tries], [], self._scale):
+            row = [None] * len(values)
+            for pos, value in zip(gather, values):
+                row[pos] = value
+            yield RelTuple.from_values(schema, tuple(row)), mult
+
+    def _search(self, depth: int, nodes: list, binding: list, mult: int):
+        """
+        Recursive generator binding the variable at the given depth.
+
+        :param depth: (int) position of the variable in the order.
+        :param nodes: (list) current trie level of every relation.
+        :param binding: (list) values bound to the preceding variables.
+        :param mult: (int) product of the multiplicities of completed relations.
+        :return: (Generator) iterating values and multiplicities of the join results.
+        """
+        if depth == len(self._order):
+            yield tuple(binding), mult
+            return
+
+        participants = self._participants[depth]
+        for value in _leapfrog([nodes[i][0] for i, _ in participants]):
+            children = list(nodes)
+            value_mult = mult
+            for i, last in participants:
+                child = nodes[i][1][value]
+                if last:
+                    value_mult *= child
+                    children[i] = None
+                else:
+                    children[i] = child
+
+            binding.append(value)
+            yield from self._search(depth + 1, children, binding, value_mult)
+            binding.pop()
+
+    def evaluate(self, name=""):
+        """
+        Function to materialize the join result.
+
+        :param name: (String) name of the resulting relation.
+        :return: (MultisetRelation) result of the join.
+        """
+        rel = MultisetRelation(name, set(self._order))
+        rel.add(dict(self.generator()))
+        return rel
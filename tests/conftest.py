@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The models are imported relative to the root of the repository, as by the scripts therein
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,47 @@
+from benchmark import naive_join, relations
+from models.ColumnarRelation import ColumnarMultisetRelation
+from models.Relation import MultisetRelation, RelationalCatalog, RelTuple
+
+
+def relation(name, variables, rows):
+    rel = MultisetRelation(name, set(variables))
+    rel.add([RelTuple(dict(zip(variables, row))) for row in rows])
+    return rel
+
+
+def results(relation):
+    """
+    Function to obtain the tuples of a relation with a non-zero multiplicity, for comparisons.
+    """
+    return {tup: mult for tup, mult in relation.generator() if mult != 0}
+
+
+def expected(hypergraph, catalog):
+    """
+    Function to join the relations of the atoms of a query naively, as the reference.
+    """
+    edges = sorted(hypergraph.get_edges(), key=lambda edge: edge.get_label())
+    order, variables = [], set()
+    while edges:
+        # join a connected edge next, so that the nested loops never build a cartesian product
+        edge = next((edge for edge in edges if variables.intersection(edge.get_variables())), edges[0])
+        edges.remove(edge)
+        order.append(catalog.get(edge.get_label()))
+        variables.update(edge.get_variables())
+
+    return results(catalog.decode(naive_join(order)))
+
+
+def generate(hypergraph, backend, encoding=False, size=30, domain=5, seed=0):
+    """
+    Function to generate a catalog for a query, storing its relations in the given backend.
+    """
+    generated = relations(hypergraph, size, domain, seed=seed)
+    catalog = RelationalCatalog(encoding=encoding)
+    for edge in hypergraph.get_edges():
+        rel = generated.get(edge.get_label())
+        if backend is ColumnarMultisetRelation:
+            rel = ColumnarMultisetRelation.from_relation(rel)
+        catalog.add(rel)
+
+    return catalog
@@ -0,0 +1,52 @@
+import pytest
+
+from benchmark import chain, cycle, random_acyclic, snowflake, star
+from helpers import expected, generate, results
+from models.Aggregate import Count
+from models.ColumnarRelation import ColumnarMultisetRelation
+from models.Relation import MultisetRelation
+
+QUERIES = {"chain": chain(4), "star": star(4), "snowflake": snowflake(3, 2), "acyclic": random_acyclic(6, seed=1),
+           "cycle": cycle(4)}
+
+
+def evaluate(hypergraph, catalog, full=False):
+    join_tree = hypergraph.join_tree(2)
+    join_tree.materialize(catalog)
+    gjt = join_tree.generalize()
+    gjt.initialize(catalog)
+    gjt.semi_join_reduction(full)
+    return gjt
+
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+@pytest.mark.parametrize("backend", [MultisetRelation, ColumnarMultisetRelation])
+@pytest.mark.parametrize("encoding", [False, True])
+def test_enumerate_matches_naive_join(name, backend, encoding):
+    hypergraph = QUERIES[name]
+    catalog = generate(hypergraph, backend, encoding)
+    gjt = evaluate(hypergraph, catalog)
+
+    assert results(gjt.enumerate()) == expected(hypergraph, catalog)
+
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+@pytest.mark.parametrize("backend", [MultisetRelation, ColumnarMultisetRelation])
+@pytest.mark.parametrize("full", [False, True])
+def test_iter_results_matches_enumerate(name, backend, full):
+    hypergraph = QUERIES[name]
+    catalog = generate(hypergraph, backend, encoding=True)
+    gjt = evaluate(hypergraph, catalog, full)
+
+    streamed = list(gjt.iter_results())
+    assert len(streamed) == len({tup for tup, _ in streamed})
+    assert dict(streamed) == results(gjt.enumerate())
+
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+def test_count_matches_naive_join(name):
+    hypergraph = QUERIES[name]
+    catalog = generate(hypergraph, MultisetRelation)
+    gjt = evaluate(hypergraph, catalog)
+
+    assert gjt.aggregate(Count()) == sum(expected(hypergraph, catalog).values())
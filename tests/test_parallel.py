@@ -0,0 +1,46 @@
+import pytest
+
+from benchmark import chain, cycle, snowflake, star
+from helpers import generate, results
+from models.ColumnarRelation import ColumnarMultisetRelation
+from models.Parallel import ParallelExecutor, PartitionedExecutor
+from models.Relation import MultisetRelation
+
+QUERIES = {"chain": chain(4), "star": star(4), "snowflake": snowflake(3, 2), "cycle": cycle(4)}
+
+
+def generalized(hypergraph, catalog):
+    join_tree = hypergraph.join_tree(2)
+    join_tree.materialize(catalog)
+    return join_tree.generalize()
+
+
+def serial(hypergraph, backend, encoding):
+    catalog = generate(hypergraph, backend, encoding)
+    gjt = generalized(hypergraph, catalog)
+    gjt.initialize(catalog)
+    gjt.semi_join_reduction()
+    return results(gjt.enumerate())
+
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+@pytest.mark.parametrize("backend", [MultisetRelation, ColumnarMultisetRelation])
+@pytest.mark.parametrize("encoding", [False, True])
+def test_parallel_executor_matches_serial(name, backend, encoding):
+    hypergraph = QUERIES[name]
+    catalog = generate(hypergraph, backend, encoding)
+    gjt = generalized(hypergraph, catalog)
+    ParallelExecutor(max_workers=2).run(gjt, catalog)
+
+    assert results(gjt.enumerate()) == serial(hypergraph, backend, encoding)
+
+
+@pytest.mark.parametrize("name", sorted(QUERIES))
+@pytest.mark.parametrize("encoding", [False, True])
+def test_partitioned_executor_matches_serial(name, encoding):
+    hypergraph = QUERIES[name]
+    catalog = generate(hypergraph, MultisetRelation, encoding)
+    gjt = generalized(hypergraph, catalog)
+
+    result = PartitionedExecutor(partitions=3, max_workers=2).enumerate(gjt, catalog)
+    assert results(result) == serial(hypergraph, MultisetRelation, encoding)
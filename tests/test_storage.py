@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from benchmark import chain, cycle
+from helpers import expected, generate, relation, results
+from models.ColumnarRelation import ColumnarMultisetRelation
+from models.Relation import MultisetRelation, RelationalCatalog, RelTuple
+from models.Storage import open_catalog, read_relation, write_catalog, write_relation
+
+
+def rows():
+    return relation("R", ("A", "B", "C"), [(1, 2.5, "x"), (1, 3.0, "y"), (2, 2.5, "x"), (1, 2.5, "x")])
+
+
+@pytest.mark.parametrize("backend", [MultisetRelation, ColumnarMultisetRelation])
+def test_relation_round_trip(tmp_path, backend):
+    rel = rows() if backend is MultisetRelation else ColumnarMultisetRelation.from_relation(rows())
+    path = str(tmp_path / "R.rel")
+    write_relation(rel, path)
+
+    stored = read_relation(path)
+    assert stored.get_name() == "R"
+    assert stored.get_variables() == {"A", "B", "C"}
+    assert results(stored) == results(rows())
+
+
+def test_relation_round_trip_keeps_index(tmp_path):
+    path = str(tmp_path / "R.rel")
+    write_relation(rows(), path, index={"A"})
+
+    stored = read_relation(path, name="S")
+    assert stored.get_name() == "S"
+    assert stored.get_index()[0] == ["A"]
+    assert results(stored.retrieve(RelTuple({"A": 1}))) == {tup: mult for tup, mult in results(rows()).items()
+                                                             if tup.get("A") == 1}
+
+
+def test_relation_round_trip_rejects_objects(tmp_path):
+    rel = relation("R", ("A",), [((1, 2),)])
+    with pytest.raises(ValueError):
+        write_relation(rel, str(tmp_path / "R.rel"))
+
+
+@pytest.mark.parametrize("hypergraph", [chain(3), cycle(4)], ids=["chain", "cycle"])
+@pytest.mark.parametrize("encoding", [False, True])
+def test_catalog_round_trip(tmp_path, hypergraph, encoding):
+    catalog = generate(hypergraph, MultisetRelation, encoding)
+    names = sorted(edge.get_label() for edge in hypergraph.get_edges())
+    write_catalog(catalog, names, str(tmp_path))
+    assert os.path.exists(tmp_path / "dictionaries.json") == encoding
+
+    reopened = open_catalog(str(tmp_path))
+    assert reopened.is_encoding() == encoding
+    for name in names:
+        assert results(reopened.decode(reopened.get(name))) == results(catalog.decode(catalog.get(name)))
+
+    join_tree = hypergraph.join_tree(2)
+    join_tree.materialize(reopened)
+    gjt = join_tree.generalize()
+    gjt.initialize(reopened)
+    gjt.semi_join_reduction()
+    assert results(gjt.enumerate()) == expected(hypergraph, catalog)
+
+
+def test_encoded_catalog_opens_decoded(tmp_path):
+    catalog = generate(chain(3), MultisetRelation, encoding=True)
+    write_catalog(catalog, ["R0"], str(tmp_path))
+
+    reopened = open_catalog(str(tmp_path), RelationalCatalog())
+    assert results(reopened.get("R0")) == results(catalog.decode(catalog.get("R0")))
@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+from benchmark import naive_join
+from helpers import relation, results
+from models.ColumnarRelation import ColumnarMultisetRelation
+from models.HyperEdge import BagEdge, HyperEdge
+from models.HyperGraph import HyperGraph
+from models.Relation import MultisetRelation, RelationalCatalog, RelTuple
+
+
+def random_update(rnd, schemas, data):
+    """
+    Function to draw inserts and deletes for some of the relations, applying them to their rows as well.
+    """
+    update = RelationalCatalog()
+    for name in rnd.sample(sorted(schemas), rnd.randint(1, len(schemas) - 1)):
+        changes = {}
+        for _ in range(rnd.randint(1, 4)):
+            if data[name] and rnd.random() < 0.5:
+                row = rnd.choice(data[name])
+                data[name].remove(row)
+                changes[row] = changes.get(row, 0) - 1
+            else:
+                row = tuple(rnd.randrange(4) for _ in schemas[name])
+                data[name].append(row)
+                changes[row] = changes.get(row, 0) + 1
+
+        update.add(MultisetRelation(name, set(schemas[name]), {RelTuple(dict(zip(schemas[name], row))): mult
+                                                               for row, mult in changes.items() if mult != 0}))
+    return update
+
+
+def catalog(schemas, data, backend=MultisetRelation):
+    """
+    Function to store the rows of every relation in a fresh catalog, in the given backend.
+    """
+    catalog = RelationalCatalog()
+    for name, variables in schemas.items():
+        rel = relation(name, variables, data[name])
+        if backend is ColumnarMultisetRelation:
+            rel = ColumnarMultisetRelation.from_relation(rel)
+        catalog.add(rel)
+
+    return catalog
+
+
+def evaluate(join_tree, catalog, full=False):
+    join_tree.materialize(catalog)
+    gjt = join_tree.generalize()
+    gjt.initialize(catalog)
+    gjt.semi_join_reduction(full)
+    return gjt
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("backend", [MultisetRelation, ColumnarMultisetRelation])
+@pytest.mark.parametrize("full", [False, True])
+def test_acyclic_update_matches_recompute(seed, backend, full):
+    rnd = random.Random(seed)
+    schemas = {"R": ("A", "B"), "S": ("B", "C"), "T": ("B", "D"), "U": ("D", "E")}
+    data = {name: [tuple(rnd.randrange(4) for _ in variables) for _ in range(12)]
+            for name, variables in schemas.items()}
+    hypergraph = HyperGraph({"A", "B", "C", "D", "E"}, {HyperEdge(name, set(variables))
+                                                        for name, variables in schemas.items()})
+
+    gjt = evaluate(hypergraph.join_tree(), catalog(schemas, data, backend), full)
+    for _ in range(6):
+        gjt.update(random_update(rnd, schemas, data))
+        recomputed = evaluate(hypergraph.join_tree(), catalog(schemas, data, backend))
+        assert results(gjt.enumerate()) == results(recomputed.enumerate())
+        assert dict(gjt.iter_results()) == results(recomputed.enumerate())
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("full", [False, True])
+def test_cyclic_update_matches_naive_join(seed, full):
+    rnd = random.Random(seed)
+    schemas = {"R": ("A", "B"), "S": ("B", "C"), "T": ("A", "C"), "U": ("C", "D")}
+    data = {name: [tuple(rnd.randrange(4) for _ in variables) for _ in range(12)]
+            for name, variables in schemas.items()}
+
+    hypergraph = HyperGraph({"A", "B", "C", "D"}, {HyperEdge(name, set(variables))
+                                                   for name, variables in schemas.items()})
+    join_tree = hypergraph.join_tree(2)
+    assert any(isinstance(node.get_label(), BagEdge) for node in join_tree.get_root().preorder())
+
+    gjt = evaluate(join_tree, catalog(schemas, data), full)
+
+    for _ in range(6):
+        gjt.update(random_update(rnd, schemas, data))
+        expected = results(naive_join([relation(name, variables, data[name])
+                                       for name, variables in schemas.items()]))
+        assert results(gjt.enumerate()) == expected
+        assert sum(mult for _, mult in gjt.iter_results()) == sum(expected.values())